@@ -2,9 +2,11 @@
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+from sqlalchemy import text
+import anyio.to_thread
 import sys
 import os
 import time
@@ -13,7 +15,9 @@ import time
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from shared.config import get_settings
-from shared.auth import initialize_firebase
+from shared.auth import initialize_firebase, refresh_public_keys
+from shared import database
+from shared.gcs import warm_storage_client
 
 # Import routes
 try:
@@ -29,19 +33,60 @@ except ImportError:
 settings = get_settings()
 
 
+def _warm_sync_engine() -> None:
+    """Open one pooled connection on the sync engine (blocking; run in a worker thread)."""
+    with database.engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events."""
     # Startup
     print("🚀 Starting Document AI API Gateway...")
+
+    # Sync dependencies and DB sessions run in the threadpool; widen it past the default 40
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
     try:
-        initialize_firebase()
+        await anyio.to_thread.run_sync(initialize_firebase)
         print("✅ Firebase initialized")
     except Exception as e:
         print(f"⚠️  Warning: Firebase initialization failed: {e}")
 
+    # Warm up connections and signing keys so the first request doesn't pay for them
+    try:
+        await anyio.to_thread.run_sync(refresh_public_keys)
+        print("✅ Firebase signing keys fetched")
+    except Exception as e:
+        print(f"⚠️  Warning: Firebase signing key prefetch failed: {e}")
+
+    try:
+        await anyio.to_thread.run_sync(_warm_sync_engine)
+        async with database.async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        print("✅ Database connections warmed up")
+    except Exception as e:
+        print(f"⚠️  Warning: Database warmup failed: {e}")
+
+    try:
+        await anyio.to_thread.run_sync(warm_storage_client)
+        print("✅ Cloud Storage credentials fetched")
+    except Exception as e:
+        print(f"⚠️  Warning: Cloud Storage warmup failed: {e}")
+
+    invalidation_listener = None
+    try:
+        # Imported here: middleware is only importable when running from api_gateway/
+        from middleware.auth_middleware import start_user_context_invalidation_listener
+        invalidation_listener = start_user_context_invalidation_listener()
+    except Exception as e:
+        print(f"⚠️  Warning: User context invalidation listener failed to start: {e}")
+
     yield
 
+    if invalidation_listener is not None:
+        invalidation_listener.cancel()
+
     # Shutdown
     print("👋 Shutting down Document AI API Gateway...")
 
@@ -53,6 +98,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
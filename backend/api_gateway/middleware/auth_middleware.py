@@ -1,35 +1,136 @@
 """Authentication middleware and dependencies."""
 
+import asyncio
+from dataclasses import dataclass
 from typing import Optional, Dict, Any
-from fastapi import Depends, HTTPException, status, Header
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, Request, status, Header
 from sqlalchemy.orm import Session
+import threading
 import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from shared.cache import cache
 from shared.database import get_db
-from shared.auth import verify_firebase_token
+from shared.auth import extract_claims, verify_firebase_token, verify_firebase_token_strict
 from shared.models import User, Tenant
 
+# User/tenant fields resolved from the database, keyed by Firebase UID.
+# Plain values only (no ORM instances), so entries are safe to share across sessions.
+_user_context_cache: TTLCache = TTLCache(maxsize=50_000, ttl=60)
+_user_context_lock = threading.Lock()
 
-async def get_current_user_from_token(
+ADMIN_ROLE = "admin"
+
+# Redis channel that carries user-context invalidations to every gateway instance
+USER_CONTEXT_INVALIDATION_CHANNEL = "auth:invalidate"
+
+
+def _drop_user_context(firebase_uid: str) -> None:
+    with _user_context_lock:
+        _user_context_cache.pop(firebase_uid, None)
+
+
+async def invalidate_user_context(firebase_uid: str) -> None:
+    """
+    Drop the cached user context for a Firebase UID.
+
+    Call after changing a user's role or active flag so the change applies
+    to their next request instead of after the cache TTL. With Redis
+    configured, other instances are told to drop it too.
+    """
+    _drop_user_context(firebase_uid)
+
+    if cache.enabled:
+        try:
+            await cache.client.publish(USER_CONTEXT_INVALIDATION_CHANNEL, firebase_uid)
+        except Exception:
+            # Other instances fall back to the cache TTL
+            pass
+
+
+async def _listen_for_user_context_invalidations() -> None:
+    """Drop user contexts named on the invalidation channel, resubscribing after errors."""
+    while True:
+        try:
+            pubsub = cache.client.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(USER_CONTEXT_INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                data = message["data"]
+                _drop_user_context(data.decode("utf-8") if isinstance(data, bytes) else data)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await asyncio.sleep(5)
+
+
+def start_user_context_invalidation_listener() -> Optional[asyncio.Task]:
+    """
+    Subscribe to user-context invalidations from other instances.
+
+    Must be called from the running event loop. Returns the listener task
+    (cancel it on shutdown), or None when Redis isn't configured.
+    """
+    if not cache.enabled:
+        return None
+
+    return asyncio.create_task(_listen_for_user_context_invalidations())
+
+
+def _load_user_context(db: Session, firebase_uid: str) -> Optional[Dict[str, Any]]:
+    """Load the user and their tenant's status in one round trip."""
+    row = (
+        db.query(User.id, User.tenant_id, User.role, User.is_active, Tenant.is_active)
+        .outerjoin(Tenant, Tenant.id == User.tenant_id)
+        .filter(User.firebase_uid == firebase_uid)
+        .first()
+    )
+    if not row:
+        return None
+
+    user_id, tenant_id, role, is_active, tenant_is_active = row
+    return {
+        "user_id": str(user_id),
+        "tenant_id": str(tenant_id),
+        "role": role,
+        "is_active": bool(is_active),
+        "tenant_is_active": bool(tenant_is_active),
+    }
+
+
+def get_current_user_from_token(
+    request: Request,
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
     """
     Verify Firebase token and get current user info.
 
+    The result is memoized on request.state, so code outside the dependency
+    graph (get_optional_user, rate limiting) reuses it instead of verifying
+    the token again.
+
+    Declared sync so FastAPI runs it in the threadpool: token verification
+    can fetch Google's signing keys and the user lookup queries the
+    database, and neither may block the event loop.
+
     Args:
+        request: Incoming request
         authorization: Authorization header with Bearer token
         db: Database session
 
     Returns:
-        Dict containing user info (uid, email, tenant_id, role, db_user_id)
+        Dict containing user info (firebase_uid, user_id, email, tenant_id, role)
 
     Raises:
         HTTPException: If authentication fails
     """
+    current_user = getattr(request.state, "current_user", None)
+    if current_user is not None:
+        return current_user
+
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,40 +140,48 @@ async def get_current_user_from_token(
     # Verify Firebase token
     decoded_token = verify_firebase_token(authorization)
 
-    firebase_uid = decoded_token.get("uid")
+    firebase_uid = extract_claims(decoded_token).uid
     email = decoded_token.get("email")
 
-    # Get user from database
-    user = db.query(User).filter(User.firebase_uid == firebase_uid).first()
+    # Get user and tenant status, from cache when fresh
+    with _user_context_lock:
+        user_context = _user_context_cache.get(firebase_uid)
+    if user_context is None:
+        user_context = _load_user_context(db, firebase_uid)
+        if user_context is not None:
+            with _user_context_lock:
+                _user_context_cache[firebase_uid] = user_context
 
-    if not user:
+    if not user_context:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found in database. Please complete registration."
         )
 
-    if not user.is_active:
+    if not user_context["is_active"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is inactive"
         )
 
     # Check tenant is active
-    tenant = db.query(Tenant).filter(Tenant.id == user.tenant_id).first()
-    if not tenant or not tenant.is_active:
+    if not user_context["tenant_is_active"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Tenant account is inactive"
         )
 
-    return {
+    current_user = {
         "firebase_uid": firebase_uid,
-        "user_id": str(user.id),
+        "user_id": user_context["user_id"],
         "email": email,
-        "tenant_id": str(user.tenant_id),
-        "role": user.role,
-        "user": user
+        "tenant_id": user_context["tenant_id"],
+        "role": user_context["role"]
     }
+    request.state.current_user = current_user
+    request.state.user_id = current_user["user_id"]
+    request.state.tenant_id = current_user["tenant_id"]
+    return current_user
 
 
 async def get_current_user(
@@ -86,31 +195,81 @@ async def get_current_user(
     return current_user
 
 
-async def require_admin(
+def require_unrevoked_token(authorization: str = Header(None)) -> None:
+    """
+    Reject revoked tokens and disabled Firebase users.
+
+    Adds a Firebase lookup (cached for 30 seconds per token), so attach it
+    only to sensitive routers. Declared sync so the lookup runs in the
+    threadpool.
+    """
+    verify_firebase_token_strict(authorization)
+
+
+@dataclass(slots=True, frozen=True)
+class AuthContext:
+    """Identity fields a route needs, resolved once per request."""
+    firebase_uid: str
+    tenant_id: str
+    user_id: str
+    role: str
+
+
+async def get_auth_context(
     current_user: Dict[str, Any] = Depends(get_current_user)
-) -> Dict[str, Any]:
+) -> AuthContext:
+    """
+    Get the current user's tenant, user ID and role as attributes.
+
+    FastAPI caches dependencies per request, so this is built once no matter
+    how many dependencies of a route ask for it.
+    """
+    return AuthContext(
+        firebase_uid=current_user["firebase_uid"],
+        tenant_id=current_user["tenant_id"],
+        user_id=current_user["user_id"],
+        role=current_user["role"]
+    )
+
+
+def require_role(role: str):
     """
-    Require user to have admin role.
+    Build a dependency that requires the current user to have a given role.
+
+    The error detail is built once, when the dependency is built, not on
+    every request.
 
     Args:
-        current_user: Current user from get_current_user
+        role: Required role (e.g. 'admin')
 
     Returns:
-        Current user dict
+        Dependency returning the current user's AuthContext
 
     Raises:
-        HTTPException: If user is not an admin
+        HTTPException: If the user does not have the role
     """
-    if current_user.get("role") != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin access required"
-        )
+    detail = f"{role.capitalize()} access required"
 
-    return current_user
+    async def role_dependency(
+        auth_context: AuthContext = Depends(get_auth_context)
+    ) -> AuthContext:
+        if auth_context.role != role:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=detail
+            )
+
+        return auth_context
+
+    return role_dependency
+
+
+# Require user to have admin role
+require_admin = require_role(ADMIN_ROLE)
 
 
 def get_optional_user(
+    request: Request,
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ) -> Optional[Dict[str, Any]]:
@@ -123,6 +282,6 @@ def get_optional_user(
         return None
 
     try:
-        return get_current_user_from_token(authorization, db)
+        return get_current_user_from_token(request, authorization, db)
     except HTTPException:
         return None
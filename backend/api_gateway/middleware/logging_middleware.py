@@ -4,6 +4,7 @@ import uuid
 import time
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
+from backend.shared.jwt_peek import peek_tenant
 from backend.shared.logging_utils import (
     api_logger,
     request_id_var,
@@ -23,6 +24,9 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         # Extract tenant_id and user_id from auth if available
         if hasattr(request.state, 'tenant_id'):
             tenant_id_var.set(request.state.tenant_id)
+        elif 'authorization' in request.headers:
+            # Unverified, for log correlation only; the auth dependency verifies later
+            tenant_id_var.set(peek_tenant(request.headers['authorization']))
         if hasattr(request.state, 'user_id'):
             user_id_var.set(request.state.user_id)
 
@@ -1,7 +1,10 @@
 """Optimized FastAPI application with performance improvements."""
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+import anyio.to_thread
+from backend.shared.auth import initialize_firebase, refresh_public_keys
 from backend.shared.database_optimized import engine, get_db
 from backend.shared.cache import cache
 from backend.shared.logging_utils import api_logger
@@ -29,6 +32,15 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         api_logger.error("Failed to warm up database", error=e)
 
+    try:
+        # Initialize Firebase and fetch token-signing keys before taking traffic
+        # Both block on network I/O, so keep them off the event loop
+        await anyio.to_thread.run_sync(initialize_firebase)
+        await anyio.to_thread.run_sync(refresh_public_keys)
+        api_logger.info("Firebase initialized")
+    except Exception as e:
+        api_logger.error("Failed to initialize Firebase", error=e)
+
     try:
         # Pre-initialize GCS client
         storage_client = storage.Client()
@@ -39,7 +51,7 @@ async def lifespan(app: FastAPI):
     try:
         # Pre-initialize Redis (if available)
         if cache.enabled:
-            cache.client.ping()
+            await cache.client.ping()
             api_logger.info("Redis cache warmed up")
     except Exception as e:
         api_logger.error("Failed to warm up Redis", error=e)
@@ -58,6 +70,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
     openapi_tags=[
         {"name": "health", "description": "Health check endpoints"},
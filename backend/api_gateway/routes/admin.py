@@ -11,18 +11,19 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 from shared.database import get_db
 from shared.models import User, Document, InvoiceData, AuditLog
 from shared.schemas import TenantStatsResponse, UserRoleUpdateRequest, SuccessResponse
-from middleware.auth_middleware import require_admin, get_current_user
+from middleware.auth_middleware import AuthContext, require_admin, get_current_user, invalidate_user_context, require_unrevoked_token
 
-router = APIRouter()
+# Admin actions also reject revoked tokens
+router = APIRouter(dependencies=[Depends(require_unrevoked_token)])
 
 
 @router.get("/stats", response_model=TenantStatsResponse)
 async def get_tenant_stats(
-    current_user: dict = Depends(require_admin),
+    auth_context: AuthContext = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Get tenant usage statistics (admin only)."""
-    tenant_id = current_user["tenant_id"]
+    tenant_id = auth_context.tenant_id
 
     # Count documents
     total_documents = db.query(Document).filter(Document.tenant_id == tenant_id).count()
@@ -47,11 +48,11 @@ async def get_tenant_stats(
 
 @router.get("/users", response_model=list)
 async def list_tenant_users(
-    current_user: dict = Depends(require_admin),
+    auth_context: AuthContext = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """List all users in the tenant (admin only)."""
-    users = db.query(User).filter(User.tenant_id == current_user["tenant_id"]).all()
+    users = db.query(User).filter(User.tenant_id == auth_context.tenant_id).all()
     return users
 
 
@@ -59,13 +60,13 @@ async def list_tenant_users(
 async def update_user_role(
     user_id: uuid.UUID,
     request: UserRoleUpdateRequest,
-    current_user: dict = Depends(require_admin),
+    auth_context: AuthContext = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Update user role (admin only)."""
     user = db.query(User).filter(
         User.id == user_id,
-        User.tenant_id == current_user["tenant_id"]
+        User.tenant_id == auth_context.tenant_id
     ).first()
 
     if not user:
@@ -76,6 +77,7 @@ async def update_user_role(
 
     user.role = request.role
     db.commit()
+    await invalidate_user_context(user.firebase_uid)
 
     return SuccessResponse(
         success=True,
@@ -87,14 +89,14 @@ async def update_user_role(
 async def get_audit_logs(
     page: int = 1,
     page_size: int = 50,
-    current_user: dict = Depends(require_admin),
+    auth_context: AuthContext = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """Get compliance audit logs (admin only)."""
     offset = (page - 1) * page_size
 
     logs = db.query(AuditLog).filter(
-        AuditLog.tenant_id == current_user["tenant_id"]
+        AuditLog.tenant_id == auth_context.tenant_id
     ).order_by(AuditLog.created_at.desc()).offset(offset).limit(page_size).all()
 
     return logs
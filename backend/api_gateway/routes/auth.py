@@ -2,6 +2,7 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+import asyncio
 import uuid
 import sys
 import os
@@ -39,8 +40,9 @@ async def signup(
             detail="User with this email already exists"
         )
 
-    # Create Firebase user
-    firebase_uid = create_firebase_user(
+    # Create Firebase user (blocking SDK call, kept off the event loop)
+    firebase_uid = await asyncio.to_thread(
+        create_firebase_user,
         email=request.email,
         password=request.password,
         display_name=request.full_name
@@ -81,7 +83,7 @@ async def signup(
     db.refresh(user)
 
     # Set custom claims on Firebase user
-    set_custom_user_claims(firebase_uid, {
+    await asyncio.to_thread(set_custom_user_claims, firebase_uid, {
         "tenant_id": str(tenant.id),
         "role": user.role
     })
@@ -110,10 +112,11 @@ async def login(db: Session = Depends(get_db)):
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Get current authenticated user information."""
-    return current_user["user"]
+    return db.query(User).filter(User.id == current_user["user_id"]).first()
 
 
 @router.post("/logout", response_model=SuccessResponse)
@@ -8,9 +8,9 @@ import uuid
 
 from backend.shared.database import get_db
 from backend.shared.models import Document, DocumentChunk
-from backend.shared.schemas import ChatQueryRequest, ChatResponse, ChatSource
+from backend.shared.schemas import ChatQueryRequest, ChatQueryResponse, ChatSource
 from backend.shared.auth import verify_firebase_token, get_tenant_id_from_token
-from backend.shared.pubsub import PubSubPublisher
+from backend.shared.pubsub import publish_rag_ingestion_job
 
 # Import RAG components
 from vertexai.language_models import TextEmbeddingModel
@@ -22,7 +22,6 @@ settings = get_settings()
 vertexai.init(project=settings.project_id, location=settings.vertex_ai_location)
 
 router = APIRouter()
-pubsub_publisher = PubSubPublisher()
 
 # Initialize models
 embedding_model = TextEmbeddingModel.from_pretrained("textembedding-gecko@003")
@@ -48,15 +47,13 @@ async def index_document_for_chat(
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # Publish to Pub/Sub
-    message = {
-        "tenant_id": str(tenant_id),
-        "user_id": str(document.user_id),
-        "document_id": str(document_id),
-        "gcs_path": document.gcs_path,
-    }
-
-    pubsub_publisher.publish_rag_ingestion(message)
+    # Publish to Pub/Sub through the process-wide publisher
+    publish_rag_ingestion_job(
+        tenant_id=str(tenant_id),
+        user_id=str(document.user_id),
+        document_id=document_id,
+        gcs_path=document.gcs_path
+    )
 
     return {
         "message": "Document indexing started",
@@ -64,7 +61,7 @@ async def index_document_for_chat(
     }
 
 
-@router.post("/query", response_model=ChatResponse)
+@router.post("/query", response_model=ChatQueryResponse)
 async def query_documents(
     request: ChatQueryRequest,
     token_data: dict = Depends(verify_firebase_token),
@@ -160,7 +157,7 @@ Answer:"""
     answer = response.text
 
     # Step 5: Return answer with sources
-    return ChatResponse(
+    return ChatQueryResponse(
         answer=answer,
         sources=sources,
         model_used=f"gemini-1.5-{request.model}",
@@ -1,16 +1,18 @@
 """Document management endpoints."""
 
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
+import asyncio
 import uuid
 import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from shared.database import get_db
-from shared.models import Document
+from shared.database import get_async_db
+from shared.models import Document, uuid7
 from shared.schemas import (
     DocumentUploadResponse,
     DocumentResponse,
@@ -19,7 +21,7 @@ from shared.schemas import (
     SuccessResponse
 )
 from shared.config import get_settings
-from shared.gcs import upload_file_to_gcs, delete_file_from_gcs
+from shared.gcs import upload_file_to_gcs, delete_files_from_gcs
 from middleware.auth_middleware import get_current_user
 from middleware.tenant_middleware import get_tenant_filter, TenantFilter
 
@@ -31,7 +33,7 @@ router = APIRouter()
 async def upload_document(
     file: UploadFile = File(...),
     document_type: Optional[str] = Form(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -63,14 +65,15 @@ async def upload_document(
         )
 
     # Generate document ID
-    document_id = uuid.uuid4()
+    document_id = uuid7()
 
     # Upload to GCS
     try:
         # Reset file pointer
         await file.seek(0)
 
-        gcs_path = upload_file_to_gcs(
+        gcs_path = await asyncio.to_thread(
+            upload_file_to_gcs,
             file_data=file.file,
             tenant_id=current_user["tenant_id"],
             document_id=document_id,
@@ -98,8 +101,8 @@ async def upload_document(
     )
 
     db.add(document)
-    db.commit()
-    db.refresh(document)
+    await db.commit()
+    await db.refresh(document)
 
     return DocumentUploadResponse(
         document_id=document.id,
@@ -116,7 +119,7 @@ async def list_documents(
     page_size: int = 20,
     document_type: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user),
     tenant_filter: TenantFilter = Depends(get_tenant_filter)
 ):
@@ -133,7 +136,7 @@ async def list_documents(
         Paginated list of documents
     """
     # Build query
-    query = db.query(Document)
+    query = select(Document)
     query = tenant_filter.filter_query(query, Document)
     query = query.filter(Document.user_id == current_user["user_id"])
 
@@ -144,11 +147,12 @@ async def list_documents(
         query = query.filter(Document.status == status)
 
     # Get total count
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
 
     # Apply pagination
     offset = (page - 1) * page_size
-    documents = query.order_by(Document.created_at.desc()).offset(offset).limit(page_size).all()
+    query = query.order_by(Document.created_at.desc()).offset(offset).limit(page_size)
+    documents = (await db.execute(query)).scalars().all()
 
     return DocumentListResponse(
         documents=[DocumentResponse.from_orm(doc) for doc in documents],
@@ -161,14 +165,14 @@ async def list_documents(
 @router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user),
     tenant_filter: TenantFilter = Depends(get_tenant_filter)
 ):
     """Get document by ID."""
-    query = db.query(Document).filter(Document.id == document_id)
+    query = select(Document).filter(Document.id == document_id)
     query = tenant_filter.filter_query(query, Document)
-    document = query.first()
+    document = (await db.execute(query)).scalars().first()
 
     if not document:
         raise HTTPException(
@@ -183,14 +187,14 @@ async def get_document(
 async def update_document_metadata(
     document_id: uuid.UUID,
     metadata: DocumentMetadata,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user),
     tenant_filter: TenantFilter = Depends(get_tenant_filter)
 ):
     """Update document metadata."""
-    query = db.query(Document).filter(Document.id == document_id)
+    query = select(Document).filter(Document.id == document_id)
     query = tenant_filter.filter_query(query, Document)
-    document = query.first()
+    document = (await db.execute(query)).scalars().first()
 
     if not document:
         raise HTTPException(
@@ -204,8 +208,8 @@ async def update_document_metadata(
     if metadata.filename is not None:
         document.filename = metadata.filename
 
-    db.commit()
-    db.refresh(document)
+    await db.commit()
+    await db.refresh(document)
 
     return document
 
@@ -213,33 +217,32 @@ async def update_document_metadata(
 @router.delete("/{document_id}", response_model=SuccessResponse)
 async def delete_document(
     document_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user),
     tenant_filter: TenantFilter = Depends(get_tenant_filter)
 ):
     """Delete a document."""
-    query = db.query(Document).filter(Document.id == document_id)
-    query = tenant_filter.filter_query(query, Document)
-    document = query.first()
-
-    if not document:
+    # Delete from database (related records go via ON DELETE CASCADE)
+    statement = delete(Document).filter(Document.id == document_id)
+    statement = tenant_filter.filter_query(statement, Document)
+    deleted = (
+        await db.execute(statement.returning(Document.gcs_path, Document.gcs_processed_path))
+    ).one_or_none()
+
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
 
+    await db.commit()
+
     # Delete from GCS
     try:
-        delete_file_from_gcs(document.gcs_path)
-        if document.gcs_processed_path:
-            delete_file_from_gcs(document.gcs_processed_path)
+        await asyncio.to_thread(delete_files_from_gcs, [path for path in deleted if path])
     except Exception as e:
         print(f"Warning: Failed to delete GCS files: {e}")
 
-    # Delete from database (cascades to related records)
-    db.delete(document)
-    db.commit()
-
     return SuccessResponse(
         success=True,
         message="Document deleted successfully"
@@ -1,85 +1,11 @@
-"""Invoice processing routes."""
-
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-import uuid
-from datetime import datetime
-import sys
-import os
-
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-
-from backend.shared.database import get_db
-from backend.shared.models import Document, InvoiceData, User
-from backend.shared.schemas import InvoiceDataResponse, InvoiceValidation
-from backend.shared.auth import verify_firebase_token, get_tenant_id_from_token
-from backend.shared.pubsub import PubSubPublisher
-
-router = APIRouter()
-pubsub_publisher = PubSubPublisher()
-
-
-@router.post("/{document_id}/process", status_code=202)
-async def process_invoice(
-    document_id: uuid.UUID,
-    token_data: dict = Depends(verify_firebase_token),
-    db: Session = Depends(get_db)
-):
-    """
-    Trigger invoice processing for a document.
-
-    Returns 202 Accepted immediately, processing happens async.
-    """
-    tenant_id = get_tenant_id_from_token(token_data)
-
-    # Get document
-    document = (
-        db.query(Document)
-        .filter(
-            Document.id == document_id,
-            Document.tenant_id == tenant_id
-        )
-        .first()
-    )
-
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found")
-
-    if document.document_type != "invoice":
-        raise HTTPException(status_code=400, detail="Document is not an invoice")
-
-    # Publish to Pub/Sub
-    message = {
-        "tenant_id": str(tenant_id),
-        "user_id": str(document.user_id),
-        "document_id": str(document_id),
-        "gcs_path": document.gcs_path,
-        "document_type": "invoice",
-        "filename": document.filename,
-    }
-
-    pubsub_publisher.publish_invoice_processing(message)
-
-    # Update status
-    document.status = "processing"
-    document.processing_started_at = datetime.utcnow()
-    db.commit()
-
-    return {
-        "message": "Invoice processing started",
-        "document_id": str(document_id),
-        "status": "processing"
-    }
 """Invoice processing endpoints."""
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 import uuid
 import sys
 import os
-from datetime import datetime
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
@@ -87,17 +13,37 @@ from shared.database import get_db
 from shared.models import Document, InvoiceData
 from shared.schemas import (
     InvoiceProcessRequest,
+    InvoiceBatchProcessRequest,
     InvoiceDataResponse,
     InvoiceValidationRequest,
     JobStatusResponse,
+    BatchJobStatusResponse,
     SuccessResponse
 )
-from shared.pubsub import publish_invoice_processing_job
+from shared.pubsub import publish_invoice_processing_job, publish_invoice_processing_jobs_nowait
 from middleware.auth_middleware import get_current_user
 from middleware.tenant_middleware import get_tenant_filter, TenantFilter
 
 router = APIRouter()
 
+# Columns a human reviewer may correct; keys, ownership and audit fields are excluded
+CORRECTABLE_INVOICE_FIELDS = frozenset(
+    column.name
+    for column in InvoiceData.__table__.columns
+    if column.name not in {
+        "id",
+        "document_id",
+        "tenant_id",
+        "raw_extraction",
+        "is_validated",
+        "validated_by",
+        "validated_at",
+        "validation_notes",
+        "created_at",
+        "updated_at",
+    }
+)
+
 
 @router.post("/process", response_model=JobStatusResponse)
 async def process_invoice(
@@ -124,7 +70,7 @@ async def process_invoice(
 
     # Update document status
     document.status = "processing"
-    document.processing_started_at = datetime.utcnow()
+    document.processing_started_at = func.now()
     document.document_type = "invoice"
     db.commit()
 
@@ -153,89 +99,102 @@ async def process_invoice(
     )
 
 
-@router.get("/{document_id}", response_model=InvoiceDataResponse)
-async def get_invoice_data(
-    document_id: uuid.UUID,
-    token_data: dict = Depends(verify_firebase_token),
-    db: Session = Depends(get_db)
+@router.post("/process-batch", response_model=BatchJobStatusResponse)
+def process_invoice_batch(
+    request: InvoiceBatchProcessRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+    tenant_filter: TenantFilter = Depends(get_tenant_filter)
 ):
-    """Get extracted invoice data."""
-    tenant_id = get_tenant_id_from_token(token_data)
-
-    invoice_data = (
-        db.query(InvoiceData)
-        .filter(
-            InvoiceData.document_id == document_id,
-            InvoiceData.tenant_id == tenant_id
-        )
-        .first()
-    )
-
-    if not invoice_data:
-        raise HTTPException(status_code=404, detail="Invoice data not found")
-
-    return InvoiceDataResponse.from_orm(invoice_data)
-
+    """
+    Process several invoice documents (async).
 
-@router.get("", response_model=List[InvoiceDataResponse])
-async def list_invoices(
-    skip: int = 0,
-    limit: int = 50,
-    validated_only: bool = False,
-    token_data: dict = Depends(verify_firebase_token),
-    db: Session = Depends(get_db)
-):
-    """List all invoices for tenant."""
-    tenant_id = get_tenant_id_from_token(token_data)
+    Loads and updates all documents in one statement each and publishes
+    the jobs as a single batch. A plain def, so FastAPI runs it in the
+    threadpool: the sync session and waiting on the publish futures would
+    otherwise block the event loop.
+    """
+    # Get documents
+    query = db.query(Document).filter(Document.id.in_(request.document_ids))
+    query = tenant_filter.filter_query(query, Document)
+    documents = query.all()
 
-    query = db.query(InvoiceData).filter(InvoiceData.tenant_id == tenant_id)
+    found_ids = {document.id for document in documents}
+    missing_ids = [str(doc_id) for doc_id in request.document_ids if doc_id not in found_ids]
+    if missing_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Documents not found: {', '.join(missing_ids)}"
+        )
 
-    if validated_only:
-        query = query.filter(InvoiceData.is_validated == True)
+    # Capture job data before the commit expires the loaded rows
+    jobs = [(document.id, document.gcs_path) for document in documents]
 
-    invoices = (
-        query
-        .order_by(InvoiceData.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    # Update document status
+    db.query(Document).filter(Document.id.in_(found_ids)).update(
+        {
+            Document.status: "processing",
+            Document.processing_started_at: func.now(),
+            Document.document_type: "invoice",
+        },
+        synchronize_session=False
     )
+    db.commit()
 
-    return [InvoiceDataResponse.from_orm(inv) for inv in invoices]
-
+    # Publish jobs to Pub/Sub, resolving each one so a partial failure
+    # only fails the documents whose jobs were not published
+    futures = publish_invoice_processing_jobs_nowait(
+        tenant_id=current_user["tenant_id"],
+        user_id=current_user["user_id"],
+        documents=jobs
+    )
 
-@router.patch("/{document_id}/validate", response_model=InvoiceDataResponse)
-async def validate_invoice(
-    document_id: uuid.UUID,
-    validation: InvoiceValidation,
-    token_data: dict = Depends(verify_firebase_token),
-    db: Session = Depends(get_db)
-):
-    """
-    Human-in-the-loop validation/correction of invoice data.
+    message_ids = []
+    started_ids = []
+    failed_ids_by_error = {}
+    for (document_id, _), future in zip(jobs, futures):
+        try:
+            message_ids.append(future.result())
+            started_ids.append(str(document_id))
+        except Exception as e:
+            failed_ids_by_error.setdefault(str(e), []).append(document_id)
+
+    for error, failed_ids in failed_ids_by_error.items():
+        db.query(Document).filter(Document.id.in_(failed_ids)).update(
+            {
+                Document.status: "failed",
+                Document.error_message: f"Failed to publish job: {error}",
+            },
+            synchronize_session=False
+        )
+    if failed_ids_by_error:
+        db.commit()
 
-    This is a critical compliance requirement for EU AI Act.
-    """
-    tenant_id = get_tenant_id_from_token(token_data)
+    failed_document_ids = [
+        str(document_id) for failed_ids in failed_ids_by_error.values() for document_id in failed_ids
+    ]
+    if not message_ids:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to start processing: {next(iter(failed_ids_by_error))}"
+        )
 
-    # Get user
-    user = db.query(User).filter(User.firebase_uid == token_data["uid"]).first()
+    message = f"Invoice processing started for {len(message_ids)} documents."
+    if failed_document_ids:
+        message += f" {len(failed_document_ids)} could not be started."
 
-    # Get invoice data
-    invoice_data = (
-        db.query(InvoiceData)
-        .filter(
-            InvoiceData.document_id == document_id,
-            InvoiceData.tenant_id == tenant_id
-        )
-        .first()
+    return BatchJobStatusResponse(
+        job_ids=message_ids,
+        status="partial" if failed_document_ids else "processing",
+        message=message,
+        document_ids=started_ids,
+        failed_document_ids=failed_document_ids
     )
 
-    if not invoice_data:
-        raise HTTPException(status_code=404, detail="Invoice data not found")
 
-    # Apply corrections
-    for field, value in validation.corrections.items():
+@router.get("/{document_id}", response_model=InvoiceDataResponse)
+async def get_invoice_data(
+    document_id: uuid.UUID,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
     tenant_filter: TenantFilter = Depends(get_tenant_filter)
@@ -277,24 +236,15 @@ async def validate_invoice(
             detail="Invoice data not found"
         )
 
-    # Apply corrections (simplified - in production, you'd want more robust correction logic)
+    # Apply corrections to correctable columns only
     for field, value in request.corrections.items():
-        if hasattr(invoice_data, field):
+        if field in CORRECTABLE_INVOICE_FIELDS:
             setattr(invoice_data, field, value)
 
     # Mark as validated
-    invoice_data.is_validated = True
-    invoice_data.validated_by = user.id
-    invoice_data.validated_at = datetime.utcnow()
-    invoice_data.validation_notes = validation.validation_notes
-
-    db.commit()
-    db.refresh(invoice_data)
-
-    return InvoiceDataResponse.from_orm(invoice_data)
     invoice_data.is_validated = request.is_approved
     invoice_data.validated_by = current_user["user_id"]
-    invoice_data.validated_at = datetime.utcnow()
+    invoice_data.validated_at = func.now()
     invoice_data.validation_notes = request.validation_notes
 
     db.commit()
@@ -1,126 +1,145 @@
-"""Document summarization routes."""
+"""Document summarization endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-import uuid
+import asyncio
+from concurrent.futures import Future
 from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+import uuid
+import sys
+import os
 
-from backend.shared.database import get_db
-from backend.shared.models import Document, DocumentSummary, User, OCRResult
-from backend.shared.schemas import SummaryRequest, SummaryResponse
-from backend.shared.auth import verify_firebase_token, get_tenant_id_from_token
-from backend.shared.pubsub import PubSubPublisher
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from shared.database import get_async_db, get_async_session_factory
+from shared.logging_utils import api_logger
+from shared.models import Document, DocumentSummary, OCRResult
+from shared.schemas import SummarizationRequest, SummaryResponse, JobStatusResponse
+from shared.pubsub import publish_summarization_job
+from middleware.auth_middleware import AuthContext, get_auth_context
+from middleware.tenant_middleware import get_tenant_filter, TenantFilter
 
 router = APIRouter()
-pubsub_publisher = PubSubPublisher()
 
+# Validators are built once at import; responses are serialized to JSON bytes
+# by them directly instead of through FastAPI's per-request response_model pass.
+_summary_adapter = TypeAdapter(SummaryResponse)
+_summary_list_adapter = TypeAdapter(List[SummaryResponse])
+
+
+async def _mark_publish_failed(document_id: uuid.UUID, error: BaseException) -> None:
+    """Mark a document failed because its summarization job was not published."""
+    async with get_async_session_factory()() as db:
+        await db.execute(
+            update(Document)
+            .where(Document.id == document_id)
+            .values(status="failed", error_message=f"Failed to publish job: {str(error)}")
+        )
+        await db.commit()
 
-@router.post("/{document_id}/generate", status_code=202)
-async def generate_summary(
-    document_id: uuid.UUID,
-    request: SummaryRequest,
-    token_data: dict = Depends(verify_firebase_token),
-    db: Session = Depends(get_db)
-):
-    """
-    Trigger summary generation for a document.
 
-    Model preferences:
-    - auto: Automatically select best model based on document
-    - flash: Fast, cost-effective (Gemini 1.5 Flash)
-    - pro: High quality (Gemini 1.5 Pro)
+def _mark_failed_on_publish_error(document_id: uuid.UUID, loop: asyncio.AbstractEventLoop):
+    """
+    Build a done callback that marks a document failed if its job was not published.
 
-    Summary types:
-    - concise: 3-5 bullet points
-    - detailed: Comprehensive summary with sections
+    The callback runs on the publisher's thread, which must not block on the
+    database, so it only schedules the update on the app's event loop.
     """
-    tenant_id = get_tenant_id_from_token(token_data)
-
-    # Get document
-    document = (
-        db.query(Document)
-        .filter(
-            Document.id == document_id,
-            Document.tenant_id == tenant_id
+    def callback(future: Future) -> None:
+        error = future.exception()
+        if error is None:
+            return
+
+        api_logger.error(
+            "Failed to publish summarization job",
+            error=error,
+            document_id=str(document_id)
         )
-        .first()
-    )
 
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found")
+        try:
+            asyncio.run_coroutine_threadsafe(_mark_publish_failed(document_id, error), loop)
+        except RuntimeError as e:
+            # Event loop already closed (shutdown); the document stays "processing"
+            api_logger.error(
+                "Could not mark document failed after publish error",
+                error=e,
+                document_id=str(document_id)
+            )
 
-    # Check if document has OCR text (required for summarization)
-    ocr_result = db.query(OCRResult).filter(
-        OCRResult.document_id == document_id
-    ).first()
+    return callback
 
-    if not ocr_result and not document.ocr_completed:
-        raise HTTPException(
-            status_code=400,
-            detail="Document must be OCR'd before summarization. Run OCR first."
-        )
 
-    # Get user
-    user = db.query(User).filter(User.firebase_uid == token_data["uid"]).first()
-
-    # Publish to Pub/Sub
-    message = {
-        "tenant_id": str(tenant_id),
-        "user_id": str(user.id),
-        "document_id": str(document_id),
-        "gcs_path": document.gcs_path,
-        "model_preference": request.model_preference,
-        "summary_type": request.summary_type,
-    }
-
-    pubsub_publisher.publish_summarization(message)
-
-    # Update status
-    document.status = "processing"
-    document.processing_started_at = datetime.utcnow()
-    db.commit()
-
-    return {
-        "message": "Summary generation started",
-        "document_id": str(document_id),
-        "model_preference": request.model_preference,
-        "summary_type": request.summary_type,
-        "status": "processing"
-    }
-"""Document summarization endpoints."""
+async def _start_summarization(
+    document_id: uuid.UUID,
+    tenant_id: str,
+    user_id: str,
+    gcs_path: str,
+    model: str,
+    max_words: int
+) -> None:
+    """
+    Mark a document as processing and publish its summarization job.
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-import uuid
-import sys
-import os
-from datetime import datetime
+    Runs as a background task after the 202 response has been sent, so it
+    opens its own session rather than reusing the (closed) request session.
+    """
+    async with get_async_session_factory()() as db:
+        await db.execute(
+            update(Document)
+            .where(Document.id == document_id)
+            .values(status="processing", processing_started_at=func.now())
+        )
+        await db.commit()
+
+    future = publish_summarization_job(
+        tenant_id=tenant_id,
+        user_id=user_id,
+        document_id=document_id,
+        gcs_path=gcs_path,
+        model=model,
+        options={"max_words": max_words}
+    )
+    future.add_done_callback(_mark_failed_on_publish_error(document_id, asyncio.get_running_loop()))
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from shared.database import get_db
-from shared.models import Document, DocumentSummary
-from shared.schemas import SummarizationRequest, SummaryResponse, JobStatusResponse
-from shared.pubsub import publish_summarization_job
-from middleware.auth_middleware import get_current_user
-from middleware.tenant_middleware import get_tenant_filter, TenantFilter
+def _apply_cursor(query, cursor: Optional[datetime], cursor_id: Optional[uuid.UUID]):
+    """
+    Restrict a newest-first summary query to rows after the given cursor.
 
-router = APIRouter()
+    With cursor_id the (created_at, id) row comparison breaks ties between
+    summaries created in the same instant; without it only created_at is used.
+    """
+    if cursor is not None and cursor_id is not None:
+        return query.filter(tuple_(DocumentSummary.created_at, DocumentSummary.id) < (cursor, cursor_id))
+    if cursor is not None:
+        return query.filter(DocumentSummary.created_at < cursor)
+    return query
 
 
-@router.post("/generate", response_model=JobStatusResponse)
+@router.post("/generate", response_model=JobStatusResponse, status_code=status.HTTP_202_ACCEPTED)
 async def generate_summary(
     request: SummarizationRequest,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    auth_context: AuthContext = Depends(get_auth_context),
     tenant_filter: TenantFilter = Depends(get_tenant_filter)
 ):
-    """Generate document summary (async)."""
-    # Get document
-    query = db.query(Document).filter(Document.id == request.document_id)
+    """
+    Generate document summary (async).
+
+    Only the validation query runs before the 202 response; the status
+    update and the Pub/Sub publish happen in a background task.
+    """
+    # Fetch only what the job needs, plus whether an OCR result exists
+    has_ocr_result = select(OCRResult.id).where(OCRResult.document_id == Document.id).exists()
+    query = select(Document.gcs_path, Document.ocr_completed, has_ocr_result).filter(
+        Document.id == request.document_id
+    )
     query = tenant_filter.filter_query(query, Document)
-    document = query.first()
+    document = (await db.execute(query)).one_or_none()
 
     if not document:
         raise HTTPException(
@@ -128,18 +147,28 @@ async def generate_summary(
             detail="Document not found"
         )
 
-    # Publish job to Pub/Sub
-    message_id = publish_summarization_job(
-        tenant_id=current_user["tenant_id"],
-        user_id=current_user["user_id"],
-        document_id=document.id,
-        gcs_path=document.gcs_path,
+    gcs_path, ocr_completed, ocr_result_exists = document
+
+    # Summaries are generated from OCR text
+    if not ocr_result_exists and not ocr_completed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Document must be OCR'd before summarization. Run OCR first."
+        )
+
+    # Update status and publish job after responding
+    background_tasks.add_task(
+        _start_summarization,
+        document_id=request.document_id,
+        tenant_id=auth_context.tenant_id,
+        user_id=auth_context.user_id,
+        gcs_path=gcs_path,
         model=request.model,
-        options={"max_words": request.max_words}
+        max_words=request.max_words
     )
 
     return JobStatusResponse(
-        job_id=message_id,
+        job_id=str(request.document_id),
         status="processing",
         message="Summarization started. Poll /summaries/{document_id} for results."
     )
@@ -148,85 +177,71 @@ async def generate_summary(
 @router.get("/{document_id}", response_model=SummaryResponse)
 async def get_summary(
     document_id: uuid.UUID,
-    token_data: dict = Depends(verify_firebase_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    tenant_filter: TenantFilter = Depends(get_tenant_filter)
 ):
-    """Get generated summary for a document."""
-    tenant_id = get_tenant_id_from_token(token_data)
-
-    summary = (
-        db.query(DocumentSummary)
-        .filter(
-            DocumentSummary.document_id == document_id,
-            DocumentSummary.tenant_id == tenant_id
-        )
-        .first()
-    )
+    """Get document summary."""
+    query = select(DocumentSummary).filter(DocumentSummary.document_id == document_id)
+    query = tenant_filter.filter_query(query, DocumentSummary)
+    query = query.order_by(DocumentSummary.created_at.desc()).limit(1)
+    summary = (await db.execute(query)).scalars().first()
 
     if not summary:
-        raise HTTPException(status_code=404, detail="Summary not found")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Summary not found. Processing may not be complete."
+        )
 
-    return SummaryResponse.from_orm(summary)
+    return Response(
+        _summary_adapter.dump_json(_summary_adapter.validate_python(summary, from_attributes=True)),
+        media_type="application/json"
+    )
 
 
 @router.get("", response_model=List[SummaryResponse])
 async def list_summaries(
-    skip: int = 0,
-    limit: int = 50,
-    token_data: dict = Depends(verify_firebase_token),
-    db: Session = Depends(get_db)
+    cursor: Optional[datetime] = None,
+    cursor_id: Optional[uuid.UUID] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+    tenant_filter: TenantFilter = Depends(get_tenant_filter)
 ):
-    """List all summaries for tenant."""
-    tenant_id = get_tenant_id_from_token(token_data)
-
-    summaries = (
-        db.query(DocumentSummary)
-        .filter(DocumentSummary.tenant_id == tenant_id)
-        .order_by(DocumentSummary.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    """
+    List summaries for tenant, newest first.
 
-    return [SummaryResponse.from_orm(s) for s in summaries]
+    Uses keyset pagination: pass the created_at and id of the last summary
+    on the previous page as cursor and cursor_id to get the next page.
+    """
+    query = select(DocumentSummary)
+    query = tenant_filter.filter_query(query, DocumentSummary)
 
+    query = _apply_cursor(query, cursor, cursor_id)
+    query = query.order_by(DocumentSummary.created_at.desc(), DocumentSummary.id.desc()).limit(limit)
 
-@router.delete("/{document_id}", status_code=204)
-async def delete_summary(
-    document_id: uuid.UUID,
-    token_data: dict = Depends(verify_firebase_token),
-    db: Session = Depends(get_db)
-):
-    """Delete summary for a document."""
-    tenant_id = get_tenant_id_from_token(token_data)
+    summaries = (await db.execute(query)).scalars().all()
 
-    summary = (
-        db.query(DocumentSummary)
-        .filter(
-            DocumentSummary.document_id == document_id,
-            DocumentSummary.tenant_id == tenant_id
-        )
-        .first()
+    return Response(
+        _summary_list_adapter.dump_json(_summary_list_adapter.validate_python(summaries, from_attributes=True)),
+        media_type="application/json"
     )
 
-    if not summary:
-        raise HTTPException(status_code=404, detail="Summary not found")
 
-    db.delete(summary)
-    db.commit()
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+@router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_summary(
+    document_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
     tenant_filter: TenantFilter = Depends(get_tenant_filter)
 ):
-    """Get document summary."""
-    query = db.query(DocumentSummary).filter(DocumentSummary.document_id == document_id)
-    query = tenant_filter.filter_query(query, DocumentSummary)
-    summary = query.order_by(DocumentSummary.created_at.desc()).first()
+    """Delete summary for a document."""
+    # Single DELETE ... RETURNING round trip instead of select-then-delete
+    statement = delete(DocumentSummary).filter(DocumentSummary.document_id == document_id)
+    statement = tenant_filter.filter_query(statement, DocumentSummary)
+    deleted_ids = (await db.execute(statement.returning(DocumentSummary.id))).scalars().all()
 
-    if not summary:
+    if not deleted_ids:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Summary not found. Processing may not be complete."
+            detail="Summary not found"
         )
 
-    return summary
+    await db.commit()
@@ -0,0 +1,25 @@
+"""Add keyset pagination index for document summaries
+
+Revision ID: 002
+Revises: 001
+Create Date: 2025-11-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves list_summaries: tenant filter + (created_at, id) keyset, newest first
+    op.create_index('idx_summary_tenant_created', 'document_summaries', ['tenant_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_summary_tenant_created', table_name='document_summaries')
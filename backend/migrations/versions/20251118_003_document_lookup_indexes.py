@@ -0,0 +1,29 @@
+"""Add per-document lookup indexes for result tables
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-11-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Result endpoints look rows up by (document_id, tenant_id)
+    op.create_index('idx_summary_doc_tenant', 'document_summaries', ['document_id', 'tenant_id', 'created_at'])
+    op.create_index('idx_ocr_document', 'ocr_results', ['document_id', 'tenant_id'])
+    op.create_index('idx_invoice_document', 'invoice_data', ['document_id', 'tenant_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_invoice_document', table_name='invoice_data')
+    op.drop_index('idx_ocr_document', table_name='ocr_results')
+    op.drop_index('idx_summary_doc_tenant', table_name='document_summaries')
@@ -0,0 +1,146 @@
+"""Partition document_chunks by tenant and audit_logs by month
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-11-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+CHUNK_PARTITIONS = 16
+
+# Months of audit_logs partitions created ahead of the current month
+AUDIT_LOG_MONTHS_AHEAD = 12
+
+CHUNK_COLUMNS = """
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    tenant_id UUID NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
+    chunk_index INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    token_count INTEGER,
+    embedding vector(768),
+    metadata JSONB DEFAULT '{}'::jsonb,
+    created_at TIMESTAMP DEFAULT NOW()
+"""
+
+AUDIT_LOG_COLUMNS = """
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    tenant_id UUID REFERENCES tenants(id),
+    user_id UUID REFERENCES users(id),
+    document_id UUID REFERENCES documents(id),
+    action VARCHAR(100) NOT NULL,
+    details JSONB,
+    ip_address INET,
+    user_agent TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+"""
+
+CHUNK_COLUMN_NAMES = "id, document_id, tenant_id, chunk_index, content, token_count, embedding, metadata, created_at"
+AUDIT_LOG_COLUMN_NAMES = "id, tenant_id, user_id, document_id, action, details, ip_address, user_agent, created_at"
+
+
+def _set_aside(table: str, indexes: list) -> None:
+    """Rename a table out of the way and drop the indexes whose names the replacement reuses."""
+    for index in indexes:
+        op.execute(f'DROP INDEX IF EXISTS {index}')
+    op.execute(f'ALTER TABLE {table} RENAME TO {table}_old')
+    op.execute(f'ALTER TABLE {table}_old RENAME CONSTRAINT {table}_pkey TO {table}_old_pkey')
+
+
+def _create_chunk_indexes() -> None:
+    op.create_index('idx_tenant_chunks', 'document_chunks', ['tenant_id'])
+    op.create_index('idx_document_chunks', 'document_chunks', ['document_id', 'chunk_index'])
+    # Built per partition, so each graph only holds its own tenants' vectors
+    op.execute("SET LOCAL maintenance_work_mem = '2GB'")
+    op.execute(
+        'CREATE INDEX idx_embedding_hnsw ON document_chunks '
+        'USING hnsw (embedding vector_cosine_ops) WITH (m = 32, ef_construction = 128)'
+    )
+
+
+def _create_audit_log_indexes() -> None:
+    op.create_index('idx_audit_tenant', 'audit_logs', ['tenant_id', 'created_at'])
+    op.create_index('idx_audit_user', 'audit_logs', ['user_id', 'created_at'])
+
+
+def upgrade() -> None:
+    # document_chunks: hash-partitioned by tenant
+    _set_aside('document_chunks', ['idx_tenant_chunks', 'idx_document_chunks', 'idx_embedding_hnsw'])
+    op.execute(
+        f'CREATE TABLE document_chunks ({CHUNK_COLUMNS}, PRIMARY KEY (id, tenant_id)) '
+        'PARTITION BY HASH (tenant_id)'
+    )
+    for remainder in range(CHUNK_PARTITIONS):
+        op.execute(
+            f'CREATE TABLE document_chunks_p{remainder} PARTITION OF document_chunks '
+            f'FOR VALUES WITH (modulus {CHUNK_PARTITIONS}, remainder {remainder})'
+        )
+    op.execute(
+        f'INSERT INTO document_chunks ({CHUNK_COLUMN_NAMES}) '
+        f'SELECT {CHUNK_COLUMN_NAMES} FROM document_chunks_old'
+    )
+    op.execute('DROP TABLE document_chunks_old')
+    _create_chunk_indexes()
+
+    # audit_logs: range-partitioned by month, from the oldest row to a year ahead
+    _set_aside('audit_logs', ['idx_audit_tenant', 'idx_audit_user'])
+    op.execute(
+        f'CREATE TABLE audit_logs ({AUDIT_LOG_COLUMNS}, PRIMARY KEY (id, created_at)) '
+        'PARTITION BY RANGE (created_at)'
+    )
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month_start DATE := date_trunc(
+                'month', COALESCE((SELECT MIN(created_at) FROM audit_logs_old), NOW())
+            )::date;
+            last_month DATE := (date_trunc('month', NOW()) + INTERVAL '{AUDIT_LOG_MONTHS_AHEAD} months')::date;
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE audit_logs_%s PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+                    to_char(month_start, 'YYYY_MM'),
+                    month_start,
+                    (month_start + INTERVAL '1 month')::date
+                );
+                month_start := (month_start + INTERVAL '1 month')::date;
+            END LOOP;
+        END $$;
+    """)
+    op.execute('CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT')
+    op.execute(
+        f'INSERT INTO audit_logs ({AUDIT_LOG_COLUMN_NAMES}) '
+        f'SELECT {AUDIT_LOG_COLUMN_NAMES.replace("created_at", "COALESCE(created_at, NOW())")} '
+        'FROM audit_logs_old'
+    )
+    op.execute('DROP TABLE audit_logs_old')
+    _create_audit_log_indexes()
+
+
+def downgrade() -> None:
+    _set_aside('audit_logs', ['idx_audit_tenant', 'idx_audit_user'])
+    op.execute(f'CREATE TABLE audit_logs ({AUDIT_LOG_COLUMNS}, PRIMARY KEY (id))')
+    op.execute(
+        f'INSERT INTO audit_logs ({AUDIT_LOG_COLUMN_NAMES}) '
+        f'SELECT {AUDIT_LOG_COLUMN_NAMES} FROM audit_logs_old'
+    )
+    op.execute('DROP TABLE audit_logs_old CASCADE')
+    _create_audit_log_indexes()
+
+    _set_aside('document_chunks', ['idx_tenant_chunks', 'idx_document_chunks', 'idx_embedding_hnsw'])
+    op.execute(f'CREATE TABLE document_chunks ({CHUNK_COLUMNS}, PRIMARY KEY (id))')
+    op.execute(
+        f'INSERT INTO document_chunks ({CHUNK_COLUMN_NAMES}) '
+        f'SELECT {CHUNK_COLUMN_NAMES} FROM document_chunks_old'
+    )
+    op.execute('DROP TABLE document_chunks_old CASCADE')
+    _create_chunk_indexes()
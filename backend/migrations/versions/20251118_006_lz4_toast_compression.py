@@ -0,0 +1,36 @@
+"""Use lz4 compression for large TOAST-able columns
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-11-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+# (table, column) pairs whose values are routinely large enough to be TOASTed
+LZ4_COLUMNS = [
+    ('ocr_results', 'extracted_text'),
+    ('ocr_results', 'layout_data'),
+    ('invoice_data', 'line_items'),
+    ('invoice_data', 'raw_extraction'),
+    ('document_summaries', 'key_points'),
+]
+
+
+def upgrade() -> None:
+    # Requires PostgreSQL 14+; applies to values written from now on
+    for table, column in LZ4_COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION lz4')
+
+
+def downgrade() -> None:
+    for table, column in LZ4_COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION default')
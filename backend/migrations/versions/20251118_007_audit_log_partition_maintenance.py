@@ -0,0 +1,69 @@
+"""Add a function that keeps monthly audit_logs partitions ahead of time
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-11-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Run monthly by scripts/maintain_audit_log_partitions.py (see docs/ADMIN_GUIDE.md).
+    # Rows that already fell into audit_logs_default for a month are moved into
+    # that month's partition when it is created, since they would otherwise
+    # block the CREATE.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ensure_audit_log_partitions(months_ahead INTEGER DEFAULT 12)
+        RETURNS INTEGER
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            month_start DATE := date_trunc('month', NOW())::date;
+            last_month DATE := (date_trunc('month', NOW()) + make_interval(months => months_ahead))::date;
+            month_end DATE;
+            partition_name TEXT;
+            created INTEGER := 0;
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                month_end := (month_start + INTERVAL '1 month')::date;
+                partition_name := 'audit_logs_' || to_char(month_start, 'YYYY_MM');
+
+                IF to_regclass(partition_name) IS NULL THEN
+                    EXECUTE format(
+                        'CREATE TEMP TABLE audit_logs_moved ON COMMIT DROP AS '
+                        'SELECT * FROM audit_logs_default WHERE created_at >= %L AND created_at < %L',
+                        month_start, month_end
+                    );
+                    DELETE FROM audit_logs_default
+                    WHERE created_at >= month_start AND created_at < month_end;
+
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+                        partition_name, month_start, month_end
+                    );
+
+                    INSERT INTO audit_logs SELECT * FROM audit_logs_moved;
+                    DROP TABLE audit_logs_moved;
+                    created := created + 1;
+                END IF;
+
+                month_start := month_end;
+            END LOOP;
+
+            RETURN created;
+        END;
+        $$;
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP FUNCTION IF EXISTS ensure_audit_log_partitions(INTEGER)')
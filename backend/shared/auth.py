@@ -1,238 +1,305 @@
-"""Firebase authentication utilities."""
-
-from firebase_admin import auth, credentials, initialize_app
-from fastapi import HTTPException, Security
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from google.cloud import secretmanager
-import json
-import os
-
-import os
-from fastapi import HTTPException, Header
-from typing import Optional
-import firebase_admin
-from firebase_admin import credentials, auth as firebase_auth
-
-
-# Initialize Firebase Admin SDK
-def initialize_firebase():
-    """Initialize Firebase Admin SDK."""
-    if not firebase_admin._apps:
-        # Try to use Application Default Credentials first
-        try:
-            cred = credentials.ApplicationDefault()
-            firebase_admin.initialize_app(cred)
-        except Exception:
-            # Fallback to service account key if available
-            service_account_path = os.getenv("FIREBASE_SERVICE_ACCOUNT_KEY")
-            if service_account_path and os.path.exists(service_account_path):
-                cred = credentials.Certificate(service_account_path)
-                firebase_admin.initialize_app(cred)
-            else:
-                # For development, we can skip Firebase init
-                print("Warning: Firebase not initialized. Auth will not work.")
-
-
-# Initialize on module import
-try:
-    initialize_firebase()
-except Exception as e:
-    print(f"Warning: Failed to initialize Firebase: {e}")
-"""Firebase Authentication utilities."""
-
-from fastapi import HTTPException, Header
-from typing import Optional
-import firebase_admin
-from firebase_admin import auth, credentials
-import os
-
-"""Firebase authentication utilities."""
-
-from fastapi import HTTPException, Security
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from firebase_admin import auth, credentials, initialize_app
-import firebase_admin
-from typing import Optional
-import os
-
-# Initialize Firebase Admin SDK
-try:
-    # Try to use application default credentials
-    if not firebase_admin._apps:
-        cred = credentials.ApplicationDefault()
-        initialize_app(cred)
-except Exception as e:
-    print(f"Firebase initialization warning: {e}")
-    # For local development, you might need to set GOOGLE_APPLICATION_CREDENTIALS
-
-
-security = HTTPBearer()
-
-
-async def verify_firebase_token(
-    credentials: HTTPAuthorizationCredentials = Security(security)
-) -> dict:
-    """
-    Verify Firebase ID token and return decoded token data.
-
-    Args:
-        credentials: HTTP Authorization credentials
-
-    Returns:
-        Decoded token data containing uid, email, and custom claims
-
-    Raises:
-        HTTPException: If token is invalid or expired
-    """
-    try:
-        token = credentials.credentials
 """Firebase Authentication utilities."""
 
+import hashlib
 import os
-from typing import Optional, Dict, Any
+from collections import namedtuple
+import re
+import threading
+import time
+from typing import Optional, Dict, Any, List
+from cachetools import TTLCache
+from cryptography import x509
 from fastapi import HTTPException, status
+import httpx
+import jwt
+import orjson
 import firebase_admin
 from firebase_admin import credentials, auth
 from .config import get_settings
+from .jwt_peek import unverified_expiry
+from .logging_utils import api_logger
 
 settings = get_settings()
 
-# Initialize Firebase Admin SDK
-def init_firebase():
-    """Initialize Firebase Admin SDK."""
-    try:
-        if settings.environment == "dev":
-            # Local development: use service account file
-            cred = credentials.ApplicationDefault()
-        else:
-            # Production: get credentials from Secret Manager
-            client = secretmanager.SecretManagerServiceClient()
-            name = f"projects/{settings.project_id}/secrets/firebase-credentials/versions/latest"
-            response = client.access_secret_version(request={"name": name})
-            cred_json = json.loads(response.payload.data.decode("UTF-8"))
-            cred = credentials.Certificate(cred_json)
-
-        initialize_app(cred)
-    except Exception as e:
-        print(f"Firebase initialization error: {e}")
-        # Already initialized
-        pass
+# Service account key file, if one is configured and present; resolved once at import
+_CREDENTIALS_PATH = (
+    settings.firebase_credentials_path
+    if settings.firebase_credentials_path and os.path.exists(settings.firebase_credentials_path)
+    else None
+)
 
-
-# Security scheme
-security = HTTPBearer()
-
-
-async def verify_firebase_token(
-    credentials: HTTPAuthorizationCredentials = Security(security)
-) -> dict:
-    """Verify Firebase ID token and return user info."""
-    try:
-        token = credentials.credentials
-        decoded_token = auth.verify_id_token(token)
-        return decoded_token
-    except auth.InvalidIdTokenError:
-        raise HTTPException(status_code=401, detail="Invalid authentication token")
-    except auth.ExpiredIdTokenError:
-        raise HTTPException(status_code=401, detail="Authentication token has expired")
-    except Exception as e:
-        raise HTTPException(status_code=401, detail=f"Authentication failed: {str(e)}")
-
-
-def get_tenant_id_from_token(token_data: dict) -> str:
-    """Extract tenant_id from Firebase token custom claims."""
+# Passed explicitly to every auth.* call so the SDK skips its default-app lookup
 _firebase_app = None
+_firebase_initialized = False
+_firebase_init_lock = threading.Lock()
+
+# Verified tokens, keyed by a digest of the raw JWT. Firebase ID tokens live
+# for an hour, so repeat requests with the same token skip the RSA check.
+_verified_tokens: TTLCache = TTLCache(
+    maxsize=max(settings.firebase_token_cache_max, 1),
+    ttl=max(settings.firebase_token_cache_ttl, 1)
+)
+_verified_tokens_lock = threading.Lock()
+
+# Cached tokens are re-verified once they are this close to expiry
+TOKEN_EXPIRY_MARGIN_SECONDS = 60
+
+# Tokens expired by more than this are rejected without checking the signature
+EARLY_EXPIRY_LEEWAY_SECONDS = 60
+
+# 401 details for known token failures, matched on the exception's class hierarchy
+_TOKEN_ERROR_DETAILS = {
+    jwt.ExpiredSignatureError: "Authentication token has expired",
+    auth.ExpiredIdTokenError: "Authentication token has expired",
+    auth.RevokedIdTokenError: "Authentication token has been revoked",
+    jwt.InvalidTokenError: "Invalid authentication token",
+    auth.InvalidIdTokenError: "Invalid authentication token",
+}
+_TOKEN_ERRORS = tuple(_TOKEN_ERROR_DETAILS)
+
+# Identity claims read from a verified token in one pass
+Claims = namedtuple("Claims", "uid tenant_id role")
+
+# Tokens recently confirmed as not revoked, keyed by (uid, iat). The TTL bounds
+# how long a revoked token keeps passing verify_firebase_token_strict.
+_unrevoked_tokens: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+_unrevoked_tokens_lock = threading.Lock()
+
+# Emails recently looked up with no Firebase user, so retries skip the round trip.
+# Kept short so a signup elsewhere becomes visible quickly.
+_missing_emails: TTLCache = TTLCache(maxsize=5_000, ttl=60)
+_missing_emails_lock = threading.Lock()
+
+# Identity Toolkit accepts at most this many identifiers per batch lookup
+USER_BATCH_SIZE = 100
+
+# Google's signing certificates for Firebase ID tokens, keyed by kid
+FIREBASE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+FIREBASE_TOKEN_ISSUER = f"https://securetoken.google.com/{settings.firebase_project_id}"
+
+# Certificates are refetched at most this often, whether for an unknown kid
+# or after a failed fetch (keys rotate roughly daily)
+PUBLIC_KEYS_MIN_REFRESH_SECONDS = 60
 
 
-def init_firebase():
-    """Initialize Firebase Admin SDK."""
-    global _firebase_app
-    if _firebase_app is None:
 def initialize_firebase() -> None:
-    """Initialize Firebase Admin SDK."""
-    global _firebase_app
+    """
+    Initialize Firebase Admin SDK.
+
+    Safe to call from any thread: once initialized this is a flag check,
+    and concurrent first calls are serialized so the app is created once.
+    """
+    global _firebase_app, _firebase_initialized
 
-    if _firebase_app is not None:
+    if _firebase_initialized:
         return
 
-    try:
-        # Try to use service account credentials if provided
-        if settings.firebase_credentials_path and os.path.exists(settings.firebase_credentials_path):
-            cred = credentials.Certificate(settings.firebase_credentials_path)
-            _firebase_app = firebase_admin.initialize_app(cred)
-        else:
-            # Use Application Default Credentials in GCP
-            cred = credentials.ApplicationDefault()
-            _firebase_app = firebase_admin.initialize_app(cred)
+    with _firebase_init_lock:
+        if _firebase_initialized:
+            return
+
+        try:
+            # Try to use service account credentials if provided
+            if _CREDENTIALS_PATH:
+                cred = credentials.Certificate(_CREDENTIALS_PATH)
+                _firebase_app = firebase_admin.initialize_app(cred)
+            else:
+                # Use Application Default Credentials (for Cloud Run)
+                cred = credentials.ApplicationDefault()
+                _firebase_app = firebase_admin.initialize_app(cred, {
+                    'projectId': settings.firebase_project_id or settings.project_id,
+                })
+
+            _firebase_initialized = True
+            print("Firebase Admin SDK initialized successfully")
+        except Exception as e:
+            print(f"Warning: Firebase initialization failed: {e}")
+            print("Running without Firebase authentication (development mode)")
+
+
+class FirebaseKeyStore:
+    """
+    Process-wide cache of Google's Firebase token-signing keys, by kid.
+
+    Keys are kept for the Cache-Control max-age of the certificate response
+    (about six hours) and refetched when stale or when a token names a kid
+    that is not in the current set. Fetches are attempted at most once per
+    PUBLIC_KEYS_MIN_REFRESH_SECONDS, so tokens with made-up kids cannot
+    drive a fetch per request, and only one thread fetches at a time; while
+    it does, the others keep verifying against the keys already held.
+
+    Fetches are blocking, so call get() from sync code (the threadpool),
+    never directly on the event loop.
+    """
+
+    def __init__(self, url: str = FIREBASE_CERTS_URL):
+        self._url = url
+        self._http_client = httpx.Client(timeout=5.0)
+        self._keys: Dict[str, Any] = {}
+        self._attempted_at = 0.0
+        self._expire_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        """Fetch the current certificates and replace the cached key set."""
+        self._attempted_at = time.time()
+        response = self._http_client.get(self._url)
+        response.raise_for_status()
+
+        keys = {
+            kid: x509.load_pem_x509_certificate(pem.encode("utf-8")).public_key()
+            for kid, pem in response.json().items()
+        }
+        max_age = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+
+        self._keys = keys
+        self._expire_at = time.time() + (int(max_age.group(1)) if max_age else 3600)
+
+    def _needs_refresh(self, kid: Optional[str], now: float) -> bool:
+        if now - self._attempted_at < PUBLIC_KEYS_MIN_REFRESH_SECONDS:
+            return False
+        return now >= self._expire_at or kid not in self._keys
+
+    def get(self, kid: Optional[str]) -> Optional[Any]:
+        """
+        Return the public key for a kid, or None if Google doesn't publish it.
+
+        Raises:
+            httpx.HTTPError: If no keys are held yet and the fetch fails
+        """
+        now = time.time()
+        if now < self._expire_at and kid in self._keys:
+            return self._keys[kid]
+
+        # With keys in hand, don't queue behind another thread's fetch
+        if self._needs_refresh(kid, now) and self._lock.acquire(blocking=not self._keys):
+            try:
+                if self._needs_refresh(kid, time.time()):
+                    try:
+                        self.refresh()
+                    except Exception as e:
+                        if not self._keys:
+                            raise
+                        # Keep verifying with the previous keys until the next attempt
+                        api_logger.warning("Firebase signing key refresh failed", error=str(e))
+            finally:
+                self._lock.release()
+
+        return self._keys.get(kid)
+
+
+firebase_key_store = FirebaseKeyStore()
+
+
+def refresh_public_keys() -> None:
+    """Fetch Google's current Firebase token-signing certificates."""
+    firebase_key_store.refresh()
 
 
-async def verify_firebase_token(authorization: Optional[str] = Header(None)) -> dict:
+def verify_firebase_token(token: str) -> Dict[str, Any]:
     """
-    Verify Firebase ID token from Authorization header.
+    Verify Firebase ID token and return decoded claims.
 
-    Args:
-        authorization: Authorization header with Bearer token
+    The RS256 signature is checked locally against Google's cached public
+    keys, along with audience, issuer and expiry, so no SDK or network call
+    is made per token. Successful verifications are cached in-process until
+    shortly before the token expires, so only the first request with a
+    given token pays for the signature check.
 
-    Returns:
-        Decoded token data with uid, email, and custom claims
-    Verify Firebase authentication token.
+    Revocation is not checked here, since that costs a user lookup per
+    token; endpoints that need it use verify_firebase_token_strict.
 
     Args:
-        authorization: Bearer token from Authorization header
+        token: Firebase ID token (JWT)
 
     Returns:
-        Decoded token data
+        Decoded token containing uid, email, and custom claims
 
     Raises:
-        HTTPException: If token is invalid or missing
+        HTTPException: If token is invalid
     """
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Missing authorization header")
-
-    if not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Invalid authorization header format")
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No authentication token provided"
+        )
 
-    token = authorization.replace("Bearer ", "")
+    # Remove 'Bearer ' prefix if present; JWTs themselves never contain spaces
+    scheme, separator, credentials_part = token.partition(" ")
+    if separator:
+        if scheme != "Bearer":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Unsupported authorization scheme"
+            )
+        token = credentials_part
+
+    cache_key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+    with _verified_tokens_lock:
+        decoded_token = _verified_tokens.get(cache_key)
+    if decoded_token is not None:
+        if decoded_token["exp"] > time.time() + TOKEN_EXPIRY_MARGIN_SECONDS:
+            return decoded_token
+
+    # An expired token fails verification anyway; skip the RSA check for it
+    if unverified_expiry(token) < time.time() - EARLY_EXPIRY_LEEWAY_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication token has expired"
+        )
 
     try:
-        # Verify token with Firebase
-        decoded_token = firebase_auth.verify_id_token(token)
-        return decoded_token
-    except firebase_auth.InvalidIdTokenError:
-        raise HTTPException(status_code=401, detail="Invalid authentication token")
-    except firebase_auth.ExpiredIdTokenError:
-        raise HTTPException(status_code=401, detail="Expired authentication token")
+        # Verify the token
+        signing_key = firebase_key_store.get(jwt.get_unverified_header(token).get("kid"))
+        if signing_key is None:
+            # Not signed by any key Google publishes
+            raise jwt.InvalidSignatureError("Unknown signing key")
+
+        decoded_token = jwt.decode(
+            token,
+            signing_key,
+            algorithms=["RS256"],
+            audience=settings.firebase_project_id,
+            issuer=FIREBASE_TOKEN_ISSUER,
+            leeway=5,
+            options={"require": ["exp", "iat", "sub"]}
+        )
+        if not decoded_token["sub"]:
+            raise jwt.InvalidTokenError("Empty subject")
+
+        # Same shape as firebase_admin's decoded tokens
+        decoded_token["uid"] = decoded_token["sub"]
+    except _TOKEN_ERRORS as e:
+        detail = next(
+            _TOKEN_ERROR_DETAILS[cls] for cls in type(e).__mro__ if cls in _TOKEN_ERROR_DETAILS
+        )
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=detail
+        )
     except Exception as e:
-        raise HTTPException(status_code=401, detail=f"Authentication failed: {str(e)}")
-    try:
-        # Extract token from "Bearer <token>"
-        token = authorization.replace("Bearer ", "")
-
-        # Initialize Firebase if not already done
-        if _firebase_app is None:
-            init_firebase()
+        api_logger.debug("Token verification failed", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication failed"
+        )
 
-        # Verify token
-        decoded_token = auth.verify_id_token(token)
-        return decoded_token
+    if settings.firebase_token_cache_ttl > 0:
+        with _verified_tokens_lock:
+            _verified_tokens[cache_key] = decoded_token
 
-    except Exception as e:
-        raise HTTPException(status_code=401, detail=f"Invalid authentication: {str(e)}")
-            # Use Application Default Credentials (for Cloud Run)
-            cred = credentials.ApplicationDefault()
-            _firebase_app = firebase_admin.initialize_app(cred, {
-                'projectId': settings.firebase_project_id or settings.gcp_project_id,
-            })
-
-        print("Firebase Admin SDK initialized successfully")
-    except Exception as e:
-        print(f"Warning: Firebase initialization failed: {e}")
-        print("Running without Firebase authentication (development mode)")
+    return decoded_token
 
 
-def verify_firebase_token(token: str) -> Dict[str, Any]:
+def verify_firebase_token_strict(token: str) -> Dict[str, Any]:
     """
-    Verify Firebase ID token and return decoded claims.
+    Verify Firebase ID token and check it has not been revoked.
+
+    On top of verify_firebase_token, confirms the user is not disabled and
+    the token was issued after any revocation. That costs one Firebase user
+    lookup per token every 30 seconds, so reserve this for sensitive
+    endpoints.
 
     Args:
         token: Firebase ID token (JWT)
@@ -241,63 +308,73 @@ def verify_firebase_token(token: str) -> Dict[str, Any]:
         Decoded token containing uid, email, and custom claims
 
     Raises:
-        HTTPException: If token is invalid
+        HTTPException: If token is invalid or revoked
     """
-    if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="No authentication token provided"
-        )
+    decoded_token = verify_firebase_token(token)
 
-    # Remove 'Bearer ' prefix if present
-    if token.startswith("Bearer "):
-        token = token[7:]
+    cache_key = (decoded_token["uid"], decoded_token["iat"])
+    with _unrevoked_tokens_lock:
+        if cache_key in _unrevoked_tokens:
+            return decoded_token
 
     try:
-        # Verify the token
-        decoded_token = auth.verify_id_token(token)
-        return decoded_token
-    except auth.InvalidIdTokenError:
+        user = auth.get_user(decoded_token["uid"], app=_firebase_app)
+    except auth.UserNotFoundError:
         raise HTTPException(
-            status_code=401,
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication token"
         )
-    except auth.ExpiredIdTokenError:
+    except Exception as e:
         raise HTTPException(
-            status_code=401,
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication token has expired"
+            detail=f"Authentication failed: {str(e)}"
         )
-    except Exception as e:
+
+    if user.disabled:
         raise HTTPException(
-            status_code=401,
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Authentication failed: {str(e)}"
+            detail="User account is disabled"
         )
 
+    # Same rule as firebase_admin's check_revoked (timestamps in milliseconds)
+    auth_time = decoded_token.get("auth_time", decoded_token["iat"])
+    if user.tokens_valid_after_timestamp and auth_time * 1000 < user.tokens_valid_after_timestamp:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication token has been revoked"
+        )
 
-def get_tenant_id_from_token(token_data: dict) -> str:
+    with _unrevoked_tokens_lock:
+        _unrevoked_tokens[cache_key] = True
+
+    return decoded_token
+
+
+def extract_claims(token_data: dict) -> Claims:
     """
-    Extract tenant_id from decoded token.
-    Extract tenant_id from Firebase token custom claims.
+    Extract uid, tenant_id and role from a decoded token in a single pass.
 
     Args:
         token_data: Decoded Firebase token
 
     Returns:
-        Tenant ID string
-
-    Raises:
-        HTTPException: If tenant_id is missing
+        Claims namedtuple; tenant_id is None if the user has no tenant yet
     """
-    tenant_id = token_data.get("tenant_id")
-    if not tenant_id:
-        raise HTTPException(status_code=403, detail="User has no tenant association")
+    return Claims(
+        token_data.get("uid", ""),
+        token_data.get("tenant_id"),
+        token_data.get("role", "user")
+    )
 
-    return tenant_id
 
+def get_tenant_id_from_token(token_data: dict) -> str:
+    """
+    Extract tenant_id from Firebase token custom claims.
 
+    Args:
+        token_data: Decoded Firebase token
+
+    Returns:
         Tenant ID as string
 
     Raises:
@@ -306,20 +383,12 @@ def get_tenant_id_from_token(token_data: dict) -> str:
     tenant_id = token_data.get("tenant_id")
     if not tenant_id:
         raise HTTPException(
-            status_code=403,
-            detail="No tenant association found. Please contact support."
+            status_code=status.HTTP_403_FORBIDDEN,
             detail="No tenant_id found in token. User may not be associated with a tenant."
-            detail="No tenant_id found in authentication token"
         )
     return tenant_id
 
 
-def get_user_role_from_token(token_data: dict) -> str:
-    """Extract user role from Firebase token custom claims."""
-    return token_data.get("role", "user")
-def get_user_id_from_token(token_data: dict) -> str:
-    """
-    Extract user_id (Firebase UID) from decoded token.
 def get_user_role_from_token(token_data: dict) -> str:
     """
     Extract user role from Firebase token custom claims.
@@ -333,83 +402,36 @@ def get_user_role_from_token(token_data: dict) -> str:
     return token_data.get("role", "user")
 
 
-async def require_admin(token_data: dict):
-    """
-    Require admin role for endpoint access.
-        User ID (Firebase UID)
-    """
-    return token_data.get("uid", "")
-
-
-def get_user_role_from_token(token_data: dict) -> str:
+def get_user_id_from_token(token_data: dict) -> str:
     """
-    Extract user role from decoded token.
+    Extract user_id (Firebase UID) from decoded token.
 
     Args:
         token_data: Decoded Firebase token
 
-    Raises:
-        HTTPException: If user is not an admin
-    """
-    role = get_user_role_from_token(token_data)
-    if role != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
     Returns:
-        User role (default: 'user')
-    """
-    return token_data.get("role", "user")
-        User role (default: 'user')
+        User ID (Firebase UID)
     """
-    return token_data.get("role", "user")
+    return token_data.get("uid", "")
 
 
-async def create_firebase_user(email: str, password: str) -> str:
+def require_admin(token_data: dict) -> None:
     """
-    Create a new Firebase user.
+    Require admin role in the token's custom claims.
 
     Args:
-        email: User email
-        password: User password
-
-    Returns:
-        Firebase UID
+        token_data: Decoded Firebase token
 
     Raises:
-        HTTPException: If user creation fails
+        HTTPException: If user is not an admin
     """
-    try:
-        user_record = auth.create_user(
-            email=email,
-            password=password,
-            email_verified=False
-        )
-        return user_record.uid
-    except auth.EmailAlreadyExistsError:
+    if get_user_role_from_token(token_data) != "admin":
         raise HTTPException(
-            status_code=400,
-            detail="Email already exists"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
         )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to create user: {str(e)}"
-        )
-
 
-async def set_custom_user_claims(uid: str, claims: dict):
-    """
-    Set custom claims on Firebase user (for tenant_id, role, etc.).
 
-    Args:
-        uid: Firebase user ID
-        claims: Dictionary of custom claims
-    """
-    try:
-        auth.set_custom_user_claims(uid, claims)
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to set custom claims: {str(e)}"
 def create_firebase_user(email: str, password: str, display_name: Optional[str] = None) -> str:
     """
     Create a new Firebase user.
@@ -427,8 +449,11 @@ def create_firebase_user(email: str, password: str, display_name: Optional[str]
             email=email,
             password=password,
             display_name=display_name,
-            email_verified=False
+            email_verified=False,
+            app=_firebase_app
         )
+        with _missing_emails_lock:
+            _missing_emails.pop(email.lower(), None)
         return user.uid
     except auth.EmailAlreadyExistsError:
         raise HTTPException(
@@ -448,10 +473,12 @@ def set_custom_user_claims(uid: str, claims: Dict[str, Any]) -> None:
 
     Args:
         uid: Firebase user ID
-        claims: Custom claims dict (e.g., {'tenant_id': 'xxx', 'role': 'admin'})
+        claims: Custom claims dict (e.g., {'tenant_id': 'xxx', 'role': 'admin'});
+            UUID and datetime values are serialized as strings
     """
     try:
-        auth.set_custom_user_claims(uid, claims)
+        # The SDK accepts pre-encoded JSON, so it skips its own json.dumps
+        auth.set_custom_user_claims(uid, orjson.dumps(claims).decode("utf-8"), app=_firebase_app)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -469,14 +496,45 @@ def get_user_by_email(email: str) -> Optional[auth.UserRecord]:
     Returns:
         UserRecord or None if not found
     """
+    email_key = email.lower()
+    with _missing_emails_lock:
+        if email_key in _missing_emails:
+            return None
+
     try:
-        return auth.get_user_by_email(email)
+        return auth.get_user_by_email(email, app=_firebase_app)
     except auth.UserNotFoundError:
+        with _missing_emails_lock:
+            _missing_emails[email_key] = True
         return None
     except Exception:
         return None
 
 
+def get_users_by_email(emails: List[str]) -> Dict[str, auth.UserRecord]:
+    """
+    Get several Firebase users by email, up to 100 per request.
+
+    Args:
+        emails: User emails
+
+    Returns:
+        Dict of email to UserRecord; emails with no user are left out
+    """
+    users = {}
+    for start in range(0, len(emails), USER_BATCH_SIZE):
+        identifiers = [auth.EmailIdentifier(email) for email in emails[start:start + USER_BATCH_SIZE]]
+        try:
+            result = auth.get_users(identifiers, app=_firebase_app)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to look up users: {str(e)}"
+            )
+        users.update((user.email, user) for user in result.users)
+    return users
+
+
 def delete_firebase_user(uid: str) -> None:
     """
     Delete a Firebase user.
@@ -485,7 +543,7 @@ def delete_firebase_user(uid: str) -> None:
         uid: Firebase user ID
     """
     try:
-        auth.delete_user(uid)
+        auth.delete_user(uid, app=_firebase_app)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -493,6 +551,28 @@ def delete_firebase_user(uid: str) -> None:
         )
 
 
+def delete_firebase_users(uids: List[str]) -> None:
+    """
+    Delete several Firebase users, up to 100 per request.
+
+    Args:
+        uids: Firebase user IDs
+    """
+    for start in range(0, len(uids), USER_BATCH_SIZE):
+        try:
+            result = auth.delete_users(uids[start:start + USER_BATCH_SIZE], app=_firebase_app)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to delete users: {str(e)}"
+            )
+        if result.failure_count:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to delete users: {result.errors[0].reason}"
+            )
+
+
 def generate_custom_token(uid: str, additional_claims: Optional[Dict[str, Any]] = None) -> str:
     """
     Generate a custom Firebase token for a user.
@@ -505,7 +585,7 @@ def generate_custom_token(uid: str, additional_claims: Optional[Dict[str, Any]]
         Custom token string
     """
     try:
-        return auth.create_custom_token(uid, additional_claims).decode('utf-8')
+        return auth.create_custom_token(uid, additional_claims, app=_firebase_app).decode('utf-8')
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,26 +1,64 @@
 """Redis-based caching layer for API responses."""
 
-import json
+import asyncio
+import hashlib
 import os
-from typing import Optional, Any
+import time
+import orjson
+from typing import Optional, Any, Callable, Dict, List
 from functools import wraps
+from .config import get_settings
 
 # Check if Redis is available
 USE_REDIS = os.getenv('REDIS_HOST') is not None
 
+# Rollback switch: invalidate with KEYS instead of incremental SCAN
+REDIS_SCAN_DISABLED = os.getenv('REDIS_SCAN_DISABLED', 'false').lower() == 'true'
+
+# Keys fetched per SCAN call and unlinked per pipeline round trip
+INVALIDATE_BATCH_SIZE = 500
+
+# After Redis fails, skip it for this long before trying again
+CIRCUIT_BREAKER_WINDOW_SECONDS = 10
+
+settings = get_settings()
+
+if settings.redis_required and not USE_REDIS:
+    raise RuntimeError("REDIS_REQUIRED is set but REDIS_HOST is not configured")
+
 if USE_REDIS:
     import redis
+    from redis import asyncio as aioredis
+    from redis.backoff import ExponentialBackoff
+    from redis.retry import Retry
+
+    redis_connection_kwargs = dict(
+        host=os.getenv('REDIS_HOST', 'localhost'),
+        port=int(os.getenv('REDIS_PORT', 6379)),
+        password=os.getenv('REDIS_PASSWORD'),
+        socket_connect_timeout=5,
+    )
+    redis_ssl = os.getenv('REDIS_SSL', 'false').lower() == 'true'
+
+    if settings.redis_required:
+        # Strict startup: fail now rather than running without the cache
+        redis.Redis(ssl=redis_ssl, **redis_connection_kwargs).ping()
+
     try:
-        redis_client = redis.Redis(
-            host=os.getenv('REDIS_HOST', 'localhost'),
-            port=int(os.getenv('REDIS_PORT', 6379)),
-            password=os.getenv('REDIS_PASSWORD'),
-            ssl=os.getenv('REDIS_SSL', 'false').lower() == 'true',
-            decode_responses=True,
-            socket_connect_timeout=5
+        # One pool per process; requests wait for a free connection instead
+        # of sharing a single socket or opening unbounded new ones.
+        # Nothing connects until the first command.
+        redis_pool = aioredis.BlockingConnectionPool(
+            connection_class=aioredis.SSLConnection if redis_ssl else aioredis.Connection,
+            max_connections=settings.redis_pool_size,
+            timeout=5,
+            socket_keepalive=True,
+            health_check_interval=30,
+            retry=Retry(ExponentialBackoff(cap=0.5, base=0.05), 2),
+            retry_on_timeout=True,
+            **redis_connection_kwargs
         )
-        # Test connection
-        redis_client.ping()
+        redis_client = aioredis.Redis(connection_pool=redis_pool)
     except Exception:
         redis_client = None
         USE_REDIS = False
@@ -29,81 +67,228 @@ else:
 
 
 class CacheManager:
-    """Cache manager with Redis backend."""
+    """Cache manager with an asyncio Redis backend; every operation is awaitable."""
 
     def __init__(self):
         self.client = redis_client
         self.enabled = USE_REDIS and redis_client is not None
+        self._healthy = False
+        self._retry_at = 0.0
 
-    def get(self, key: str) -> Optional[Any]:
-        """Get value from cache."""
+    async def _ensure(self) -> bool:
+        """
+        Whether Redis should be used right now.
+
+        Connects lazily: the first call pings, and while Redis is down a
+        ping is retried at most once per breaker window, so an outage costs
+        one timeout per window instead of one per request.
+        """
         if not self.enabled:
+            return False
+        if self._healthy:
+            return True
+
+        now = time.monotonic()
+        if now < self._retry_at:
+            return False
+
+        try:
+            await self.client.ping()
+            self._healthy = True
+        except Exception:
+            self._retry_at = now + CIRCUIT_BREAKER_WINDOW_SECONDS
+        return self._healthy
+
+    def _trip(self):
+        """Open the breaker after a failed command."""
+        self._healthy = False
+        self._retry_at = time.monotonic() + CIRCUIT_BREAKER_WINDOW_SECONDS
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from cache."""
+        if not await self._ensure():
             return None
 
         try:
-            value = self.client.get(key)
-            return json.loads(value) if value else None
+            value = await self.client.get(key)
+            return orjson.loads(value) if value else None
         except Exception:
             # Fail gracefully - cache miss on error
+            self._trip()
             return None
 
-    def set(self, key: str, value: Any, ttl: int = 300):
+    async def set(self, key: str, value: Any, ttl: int = 300):
         """Set value in cache with TTL (default 5 minutes)."""
-        if not self.enabled:
+        if not await self._ensure():
             return
 
         try:
-            self.client.setex(key, ttl, json.dumps(value))
+            # Stored as raw bytes; no str round trip on either side
+            await self.client.setex(key, ttl, orjson.dumps(value))
         except Exception:
             # Fail gracefully - don't break app on cache errors
-            pass
+            self._trip()
+
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values in one round trip; missing keys come back as None."""
+        if not keys or not await self._ensure():
+            return [None] * len(keys)
+
+        try:
+            return [orjson.loads(value) if value else None for value in await self.client.mget(keys)]
+        except Exception:
+            self._trip()
+            return [None] * len(keys)
+
+    async def mset_ex(self, items: Dict[str, Any], ttl: int = 300):
+        """Set several values with the same TTL in one pipelined round trip."""
+        if not items or not await self._ensure():
+            return
 
-    def delete(self, key: str):
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.setex(key, ttl, orjson.dumps(value))
+            await pipe.execute()
+        except Exception:
+            self._trip()
+
+    async def delete(self, key: str):
         """Delete key from cache."""
-        if not self.enabled:
+        if not await self._ensure():
             return
 
         try:
-            self.client.delete(key)
+            await self.client.delete(key)
         except Exception:
-            pass
+            self._trip()
 
-    def invalidate_pattern(self, pattern: str):
-        """Invalidate all keys matching pattern."""
-        if not self.enabled:
+    async def invalidate_pattern(self, pattern: str):
+        """
+        Invalidate all keys matching pattern.
+
+        Walks the keyspace with SCAN rather than KEYS so Redis is never
+        blocked for the whole scan, and frees values with UNLINK in
+        pipelined batches.
+        """
+        if not await self._ensure():
             return
 
         try:
-            keys = self.client.keys(pattern)
-            if keys:
-                self.client.delete(*keys)
+            if REDIS_SCAN_DISABLED:
+                keys = await self.client.keys(pattern)
+                if keys:
+                    await self.client.delete(*keys)
+                return
+
+            pipe = self.client.pipeline(transaction=False)
+            pending = 0
+            async for key in self.client.scan_iter(match=pattern, count=INVALIDATE_BATCH_SIZE):
+                pipe.unlink(key)
+                pending += 1
+                if pending >= INVALIDATE_BATCH_SIZE:
+                    await pipe.execute()
+                    pending = 0
+            if pending:
+                await pipe.execute()
         except Exception:
-            pass
+            self._trip()
 
 
 # Global cache instance
 cache = CacheManager()
 
 
-def cached(key_prefix: str, ttl: int = 300):
-    """Decorator for caching function results."""
+# Misses currently being computed in this process, so concurrent callers
+# for the same key wait on one call instead of all hitting the backend
+_inflight: Dict[str, asyncio.Future] = {}
+
+# Stored in place of a None result so "not found" can be cached too
+_NONE_SENTINEL = {"__none__": True}
+
+
+def _make_cache_key(key_prefix: str, version: str, func, args: tuple, kwargs: dict) -> str:
+    """Build a fixed-length key from a digest of all positional and keyword arguments."""
+    payload = orjson.dumps((args, sorted(kwargs.items())), default=str)
+    digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+    return f"{key_prefix}:{version}:{func.__name__}:{digest}"
+
+
+def cached(key_prefix: str, ttl: int = 300, version: str = "v1", negative_ttl: int = 10):
+    """
+    Decorator for caching function results.
+
+    Arguments must be JSON-serializable (anything else is keyed by its
+    str()). Bump version to invalidate every existing entry on deploy.
+    Concurrent misses for the same key share one call, and None results
+    are cached for negative_ttl seconds (0 disables).
+    """
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Build cache key
-            cache_key = f"{key_prefix}:{':'.join(str(arg) for arg in args)}"
+            cache_key = _make_cache_key(key_prefix, version, func, args, kwargs)
 
             # Try cache first
-            cached_result = cache.get(cache_key)
+            cached_result = await cache.get(cache_key)
             if cached_result is not None:
-                return cached_result
+                return None if cached_result == _NONE_SENTINEL else cached_result
+
+            # Join a call already in flight for this key
+            inflight = _inflight.get(cache_key)
+            if inflight is not None:
+                return await asyncio.shield(inflight)
 
-            # Execute function
-            result = await func(*args, **kwargs)
+            future = asyncio.get_running_loop().create_future()
+            _inflight[cache_key] = future
+            try:
+                # Execute function
+                result = await func(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                future.exception()  # Mark retrieved in case no one else was waiting
+                raise
+            finally:
+                _inflight.pop(cache_key, None)
+            future.set_result(result)
 
             # Cache result
-            cache.set(cache_key, result, ttl)
+            if result is not None:
+                await cache.set(cache_key, result, ttl)
+            elif negative_ttl > 0:
+                await cache.set(cache_key, _NONE_SENTINEL, negative_ttl)
 
             return result
         return wrapper
     return decorator
+
+
+def cached_batch(key_fn: Callable[[Any], str], ttl: int = 300):
+    """
+    Decorator for caching per-item results of a batch function.
+
+    The wrapped function takes a list of items as its first argument and
+    returns a dict of item to result. Cached items are read with one MGET;
+    the function is only called with the misses, and their results are
+    written back with one pipelined SETEX batch. None results are not cached.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(items: List[Any], *args, **kwargs) -> Dict[Any, Any]:
+            keys = [key_fn(item) for item in items]
+            results = {
+                item: value for item, value in zip(items, await cache.mget(keys)) if value is not None
+            }
+
+            misses = [item for item in items if item not in results]
+            if misses:
+                fetched = await func(misses, *args, **kwargs)
+                await cache.mset_ex(
+                    {key_fn(item): value for item, value in fetched.items() if value is not None},
+                    ttl
+                )
+                results.update(fetched)
+
+            return {item: results.get(item) for item in items}
+        return wrapper
+    return decorator
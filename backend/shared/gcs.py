@@ -1,28 +1,118 @@
 """Google Cloud Storage utilities."""
 
-from google.cloud import storage
-from typing import BinaryIO
-import uuid
-from datetime import datetime, timedelta
-
-import os
-from typing import Optional, BinaryIO
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import lru_cache
+from typing import List, Optional, BinaryIO, Tuple
+from cachetools import TTLCache
 from uuid import UUID
+from google.auth.transport.requests import Request as AuthRequest
 from google.cloud import storage
-from google.cloud.exceptions import NotFound
+from requests.adapters import HTTPAdapter
+from google.cloud.exceptions import NotFound, from_http_response
 from .config import get_settings
+from .logging_utils import utc_timestamp
 
 settings = get_settings()
 
+# Uploads are sent as resumable sessions in chunks of this size, so a
+# failed request retries one chunk rather than the whole file. Must be a
+# multiple of 256 KiB.
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Concurrent metadata requests for bulk lookups (the HTTP pool is shared)
+BULK_LOOKUP_WORKERS = 32
+
+# Keep-alive connections held by the client's HTTP session. requests
+# defaults to 10, which makes concurrent callers open and discard extra
+# TLS connections. Retries stay with the storage library's own policy.
+HTTP_POOL_SIZE = 64
+
+# Sub-requests allowed in one JSON API batch request
+BATCH_REQUEST_LIMIT = 100
+
+# Signed URLs recently issued, keyed by (bucket, path, expiration_minutes).
+# URLs are signed for exactly the requested lifetime and handed out again
+# for at most SIGNED_URL_REUSE_SECONDS, stopping early enough that a reused
+# URL always has SIGNED_URL_MIN_REMAINING_SECONDS left.
+SIGNED_URL_REUSE_SECONDS = 300
+SIGNED_URL_MIN_REMAINING_SECONDS = 60
+_signed_urls: TTLCache = TTLCache(maxsize=10_000, ttl=SIGNED_URL_REUSE_SECONDS)
+_signed_urls_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _client() -> storage.Client:
+    """
+    Get the process-wide GCS client.
+
+    The client owns the HTTP session, so sharing it keeps TLS connections
+    to storage.googleapis.com warm across calls.
+    """
+    client = storage.Client(project=settings.project_id)
+    client._http.mount(
+        "https://",
+        HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE),
+    )
+    return client
+
+
+@lru_cache(maxsize=128)
+def _bucket(name: str) -> storage.Bucket:
+    """Get a (cached) bucket handle; building one makes no API call."""
+    return _client().bucket(name)
+
+
+@lru_cache(maxsize=2048)
+def _parse_gcs_uri(gcs_uri: str) -> Tuple[str, str]:
+    """
+    Split gs://bucket/path into (bucket, path).
+
+    Raises:
+        ValueError: If gcs_uri is not a gs:// URI naming an object
+    """
+    if not gcs_uri.startswith("gs://"):
+        raise ValueError(f"Invalid GCS path: {gcs_uri}")
+
+    bucket_name, _, blob_path = gcs_uri[5:].partition("/")
+    if not bucket_name or not blob_path:
+        raise ValueError(f"Invalid GCS path: {gcs_uri}")
+
+    return bucket_name, blob_path
+
+
+def _signed_url(bucket_name: str, blob_path: str, expiration_minutes: int) -> str:
+    """Get a v4 GET signed URL, reusing a recent one while enough of its lifetime remains."""
+    key = (bucket_name, blob_path, expiration_minutes)
+    now = time.monotonic()
+    with _signed_urls_lock:
+        cached = _signed_urls.get(key)
+    if cached is not None and now < cached[1]:
+        return cached[0]
+
+    url = _bucket(bucket_name).blob(blob_path).generate_signed_url(
+        version="v4",
+        expiration=timedelta(minutes=expiration_minutes),
+        method="GET",
+    )
+    reuse_seconds = min(SIGNED_URL_REUSE_SECONDS, expiration_minutes * 60 - SIGNED_URL_MIN_REMAINING_SECONDS)
+    if reuse_seconds > 0:
+        with _signed_urls_lock:
+            _signed_urls[key] = (url, now + reuse_seconds)
+    return url
+
 
 class GCSManager:
     """Manage Google Cloud Storage operations."""
 
     def __init__(self):
-        self.client = storage.Client(project=settings.project_id)
-        self.bucket_uploads = self.client.bucket(settings.gcs_bucket_uploads)
-        self.bucket_processed = self.client.bucket(settings.gcs_bucket_processed)
-        self.bucket_temp = self.client.bucket(settings.gcs_bucket_temp)
+        self.client = _client()
+        self.bucket_uploads = _bucket(settings.gcs_bucket_uploads)
+        self.bucket_processed = _bucket(settings.gcs_bucket_processed)
+        self.bucket_temp = _bucket(settings.gcs_bucket_temp)
 
     def upload_document(
         self,
@@ -47,13 +137,13 @@ class GCSManager:
         """
         # Generate blob path: {tenant_id}/{document_id}/original.pdf
         blob_name = f"{tenant_id}/{document_id}/{filename}"
-        blob = self.bucket_uploads.blob(blob_name)
+        blob = self.bucket_uploads.blob(blob_name, chunk_size=UPLOAD_CHUNK_SIZE)
 
         # Upload with metadata
         blob.metadata = {
             "tenant_id": tenant_id,
             "document_id": document_id,
-            "uploaded_at": datetime.utcnow().isoformat(),
+            "uploaded_at": utc_timestamp(),
         }
 
         blob.upload_from_file(file, content_type=content_type)
@@ -63,49 +153,117 @@ class GCSManager:
 
     def download_document(self, gcs_uri: str) -> bytes:
         """Download document from GCS."""
-        # Parse GCS URI: gs://bucket/path
-        bucket_name = gcs_uri.split("/")[2]
-        blob_path = "/".join(gcs_uri.split("/")[3:])
-
-        bucket = self.client.bucket(bucket_name)
-        blob = bucket.blob(blob_path)
+        bucket_name, blob_path = _parse_gcs_uri(gcs_uri)
+        blob = _bucket(bucket_name).blob(blob_path)
 
         return blob.download_as_bytes()
 
+    def download_to_stream(self, gcs_uri: str, dest: BinaryIO, chunk_size: int = 1024 * 1024) -> None:
+        """
+        Download document from GCS into a writable file object.
+
+        The object is fetched in chunk_size ranges and written as each
+        arrives, so memory use stays at one chunk however large the file is.
+
+        Args:
+            gcs_uri: GCS URI (gs://bucket/path)
+            dest: Binary file object to write to
+            chunk_size: Bytes per ranged request (multiple of 256 KiB)
+        """
+        bucket_name, blob_path = _parse_gcs_uri(gcs_uri)
+        blob = _bucket(bucket_name).blob(blob_path, chunk_size=chunk_size)
+
+        blob.download_to_file(dest)
+
+    def list_tenant_documents(self, tenant_id: str) -> List[str]:
+        """
+        List the GCS URIs of a tenant's uploaded documents.
+
+        Only object names are requested, so each page (up to 1000 objects)
+        carries no per-object metadata.
+        """
+        blobs = self.bucket_uploads.list_blobs(
+            prefix=f"{tenant_id}/",
+            fields="items(name),nextPageToken",
+            page_size=1000,
+        )
+        uri_prefix = f"gs://{self.bucket_uploads.name}/"
+        return [uri_prefix + blob.name for blob in blobs]
+
     def get_signed_url(self, gcs_uri: str, expiration_minutes: int = 15) -> str:
         """Generate signed URL for temporary access."""
-        bucket_name = gcs_uri.split("/")[2]
-        blob_path = "/".join(gcs_uri.split("/")[3:])
+        bucket_name, blob_path = _parse_gcs_uri(gcs_uri)
+        return _signed_url(bucket_name, blob_path, expiration_minutes)
+
+    def delete_document(self, gcs_uri: str):
+        """Delete document from GCS."""
+        bucket_name, blob_path = _parse_gcs_uri(gcs_uri)
+        blob = _bucket(bucket_name).blob(blob_path)
+        blob.delete()
+
+    def delete_many(self, gcs_uris: List[str]) -> None:
+        """Delete documents from GCS, up to 100 per batch request."""
+        delete_files_from_gcs(gcs_uris)
 
-        bucket = self.client.bucket(bucket_name)
-        blob = bucket.blob(blob_path)
 
-        url = blob.generate_signed_url(
-            version="v4",
-            expiration=timedelta(minutes=expiration_minutes),
-            method="GET",
+class AsyncGCSManager:
+    """
+    Awaitable GCSManager for async request handlers.
+
+    google-cloud-storage is blocking, so each call runs on a worker thread
+    and the event loop keeps serving other requests during the round trip.
+    All instances share the process-wide client and its connection pool.
+    """
+
+    def __init__(self):
+        self._sync = GCSManager()
+
+    async def upload_document(
+        self,
+        file: BinaryIO,
+        tenant_id: str,
+        document_id: str,
+        filename: str,
+        content_type: str = "application/pdf"
+    ) -> str:
+        """Upload document to GCS; see GCSManager.upload_document."""
+        return await asyncio.to_thread(
+            self._sync.upload_document, file, tenant_id, document_id, filename, content_type
         )
 
-        return url
+    async def download_document(self, gcs_uri: str) -> bytes:
+        """Download document from GCS."""
+        return await asyncio.to_thread(self._sync.download_document, gcs_uri)
 
-    def delete_document(self, gcs_uri: str):
+    async def get_signed_url(self, gcs_uri: str, expiration_minutes: int = 15) -> str:
+        """Generate signed URL for temporary access."""
+        return await asyncio.to_thread(self._sync.get_signed_url, gcs_uri, expiration_minutes)
+
+    async def delete_document(self, gcs_uri: str) -> None:
         """Delete document from GCS."""
-        bucket_name = gcs_uri.split("/")[2]
-        blob_path = "/".join(gcs_uri.split("/")[3:])
+        await asyncio.to_thread(self._sync.delete_document, gcs_uri)
 
-        bucket = self.client.bucket(bucket_name)
-        blob = bucket.blob(blob_path)
-        blob.delete()
-# Initialize GCS client
-_storage_client = None
+    async def delete_many(self, gcs_uris: List[str]) -> None:
+        """Delete documents from GCS, up to 100 per batch request."""
+        await asyncio.to_thread(self._sync.delete_many, gcs_uris)
 
 
 def get_storage_client() -> storage.Client:
-    """Get or create GCS client."""
-    global _storage_client
-    if _storage_client is None:
-        _storage_client = storage.Client(project=settings.gcp_project_id)
-    return _storage_client
+    """Get the shared GCS client."""
+    return _client()
+
+
+def warm_storage_client() -> None:
+    """
+    Build the shared GCS client and fetch its access token ahead of use.
+
+    Meant for service startup: otherwise the first GCS call of each
+    instance also pays for the metadata-server token fetch. The library
+    refreshes the token itself when it nears expiry.
+    """
+    credentials = _client()._http.credentials
+    if not credentials.valid:
+        credentials.refresh(AuthRequest())
 
 
 def upload_file_to_gcs(
@@ -120,7 +278,7 @@ def upload_file_to_gcs(
     Upload a file to Google Cloud Storage.
 
     Args:
-        file_data: File binary data
+        file_data: File binary data, read from its current position
         tenant_id: Tenant ID for path isolation
         document_id: Document ID
         filename: Original filename
@@ -131,21 +289,20 @@ def upload_file_to_gcs(
         GCS path (gs://bucket/path/to/file)
     """
     if bucket_name is None:
-        bucket_name = settings.gcs_uploads_bucket
+        bucket_name = settings.gcs_bucket_uploads
 
-    client = get_storage_client()
-    bucket = client.bucket(bucket_name)
+    bucket = _bucket(bucket_name)
 
     # Construct GCS path: {tenant_id}/{document_id}/{filename}
     blob_path = f"{tenant_id}/{document_id}/{filename}"
-    blob = bucket.blob(blob_path)
+    blob = bucket.blob(blob_path, chunk_size=UPLOAD_CHUNK_SIZE)
 
     # Set content type if provided
     if content_type:
         blob.content_type = content_type
 
     # Upload file
-    blob.upload_from_file(file_data, rewind=True)
+    blob.upload_from_file(file_data)
 
     # Return GCS URI
     return f"gs://{bucket_name}/{blob_path}"
@@ -164,17 +321,8 @@ def download_file_from_gcs(gcs_path: str) -> bytes:
     Raises:
         NotFound: If file doesn't exist
     """
-    # Parse GCS path
-    if not gcs_path.startswith("gs://"):
-        raise ValueError(f"Invalid GCS path: {gcs_path}")
-
-    path_parts = gcs_path[5:].split("/", 1)
-    bucket_name = path_parts[0]
-    blob_path = path_parts[1]
-
-    client = get_storage_client()
-    bucket = client.bucket(bucket_name)
-    blob = bucket.blob(blob_path)
+    bucket_name, blob_path = _parse_gcs_uri(gcs_path)
+    blob = _bucket(bucket_name).blob(blob_path)
 
     # Download file
     return blob.download_as_bytes()
@@ -191,17 +339,8 @@ def delete_file_from_gcs(gcs_path: str) -> bool:
         True if deleted, False if not found
     """
     try:
-        # Parse GCS path
-        if not gcs_path.startswith("gs://"):
-            raise ValueError(f"Invalid GCS path: {gcs_path}")
-
-        path_parts = gcs_path[5:].split("/", 1)
-        bucket_name = path_parts[0]
-        blob_path = path_parts[1]
-
-        client = get_storage_client()
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(blob_path)
+        bucket_name, blob_path = _parse_gcs_uri(gcs_path)
+        blob = _bucket(bucket_name).blob(blob_path)
 
         blob.delete()
         return True
@@ -209,6 +348,40 @@ def delete_file_from_gcs(gcs_path: str) -> bool:
         return False
 
 
+def delete_files_from_gcs(gcs_paths: List[str]) -> None:
+    """
+    Delete many files from Google Cloud Storage.
+
+    Deletes are sent as JSON API batch requests of up to 100 objects, so
+    N files cost N / 100 round trips instead of N. Files that are already
+    gone are ignored; every other batch is still sent before any other
+    failure is raised.
+
+    Args:
+        gcs_paths: GCS paths (gs://bucket/path/to/file)
+
+    Raises:
+        GoogleAPICallError: For the first delete that failed other than with 404
+    """
+    client = _client()
+    failures = []
+    for start in range(0, len(gcs_paths), BATCH_REQUEST_LIMIT):
+        # raise_exception=False keeps one status per sub-request instead of
+        # raising only the first error, which would hide the rest
+        batch = client.batch(raise_exception=False)
+        with batch:
+            for gcs_path in gcs_paths[start:start + BATCH_REQUEST_LIMIT]:
+                bucket_name, blob_path = _parse_gcs_uri(gcs_path)
+                _bucket(bucket_name).blob(blob_path).delete()
+        failures.extend(
+            response for response in batch._responses
+            if not 200 <= response.status_code < 300 and response.status_code != 404
+        )
+
+    if failures:
+        raise from_http_response(failures[0])
+
+
 def generate_signed_url(gcs_path: str, expiration_minutes: int = 60) -> str:
     """
     Generate a signed URL for temporary access to a GCS file.
@@ -220,26 +393,9 @@ def generate_signed_url(gcs_path: str, expiration_minutes: int = 60) -> str:
     Returns:
         Signed URL
     """
-    # Parse GCS path
-    if not gcs_path.startswith("gs://"):
-        raise ValueError(f"Invalid GCS path: {gcs_path}")
+    bucket_name, blob_path = _parse_gcs_uri(gcs_path)
 
-    path_parts = gcs_path[5:].split("/", 1)
-    bucket_name = path_parts[0]
-    blob_path = path_parts[1]
-
-    client = get_storage_client()
-    bucket = client.bucket(bucket_name)
-    blob = bucket.blob(blob_path)
-
-    # Generate signed URL
-    url = blob.generate_signed_url(
-        version="v4",
-        expiration=expiration_minutes * 60,  # Convert to seconds
-        method="GET"
-    )
-
-    return url
+    return _signed_url(bucket_name, blob_path, expiration_minutes)
 
 
 def file_exists_in_gcs(gcs_path: str) -> bool:
@@ -253,20 +409,8 @@ def file_exists_in_gcs(gcs_path: str) -> bool:
         True if file exists, False otherwise
     """
     try:
-        # Parse GCS path
-        if not gcs_path.startswith("gs://"):
-            return False
-
-        path_parts = gcs_path[5:].split("/", 1)
-        if len(path_parts) < 2:
-            return False
-
-        bucket_name = path_parts[0]
-        blob_path = path_parts[1]
-
-        client = get_storage_client()
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(blob_path)
+        bucket_name, blob_path = _parse_gcs_uri(gcs_path)
+        blob = _bucket(bucket_name).blob(blob_path)
 
         return blob.exists()
     except Exception:
@@ -284,19 +428,28 @@ def get_file_size(gcs_path: str) -> Optional[int]:
         File size in bytes or None if file doesn't exist
     """
     try:
-        # Parse GCS path
-        if not gcs_path.startswith("gs://"):
-            return None
-
-        path_parts = gcs_path[5:].split("/", 1)
-        bucket_name = path_parts[0]
-        blob_path = path_parts[1]
-
-        client = get_storage_client()
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(blob_path)
+        bucket_name, blob_path = _parse_gcs_uri(gcs_path)
+        blob = _bucket(bucket_name).blob(blob_path)
 
         blob.reload()  # Fetch metadata
         return blob.size
     except Exception:
         return None
+
+
+def get_file_sizes(gcs_paths: List[str]) -> List[Optional[int]]:
+    """
+    Get the sizes of many files, fetching their metadata concurrently.
+
+    Args:
+        gcs_paths: GCS paths (gs://bucket/path/to/file)
+
+    Returns:
+        File sizes in bytes, in the same order as gcs_paths; None for
+        files that don't exist
+    """
+    if len(gcs_paths) <= 1:
+        return [get_file_size(gcs_path) for gcs_path in gcs_paths]
+
+    with ThreadPoolExecutor(max_workers=min(BULK_LOOKUP_WORKERS, len(gcs_paths))) as executor:
+        return list(executor.map(get_file_size, gcs_paths))
@@ -0,0 +1,50 @@
+"""
+Unverified JWT claim reads.
+
+Kept apart from shared.auth so middleware can peek at tokens without
+importing Firebase or fetching signing keys. Nothing here verifies a
+signature: use the results for routing and logging only.
+"""
+
+import base64
+from typing import Any, Dict
+
+import orjson
+
+
+def _unverified_claims(token: str) -> Dict[str, Any]:
+    """Decode a JWT payload without verifying the signature."""
+    payload = token.split(".", 2)[1]
+    return orjson.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+
+
+def unverified_expiry(token: str) -> float:
+    """
+    Read the exp claim without verifying the signature.
+
+    Only used to reject tokens early; anything unreadable returns infinity
+    so full verification reports the real error.
+    """
+    try:
+        return float(_unverified_claims(token)["exp"])
+    except Exception:
+        return float("inf")
+
+
+def peek_tenant(authorization: str) -> str:
+    """
+    Read tenant_id from a token without verifying it.
+
+    For routing and log correlation before the auth dependency runs; never
+    use the result for access control.
+
+    Args:
+        authorization: Authorization header value or bare token
+
+    Returns:
+        Tenant ID claim, or empty string if absent or unreadable
+    """
+    try:
+        return str(_unverified_claims(authorization.rpartition(" ")[2]).get("tenant_id", ""))
+    except Exception:
+        return ""
@@ -3,16 +3,38 @@
 import logging
 import json
 from typing import Any, Dict, Optional
-from datetime import datetime
 from contextvars import ContextVar
 import traceback
 import os
+import time
 
 # Context variables for request tracing
 request_id_var: ContextVar[str] = ContextVar('request_id', default='')
 tenant_id_var: ContextVar[str] = ContextVar('tenant_id', default='')
 user_id_var: ContextVar[str] = ContextVar('user_id', default='')
 
+# (unix second, its "YYYY-MM-DDTHH:MM:SS" form); replaced as one tuple, so
+# concurrent readers never see a mismatched pair
+_utc_second_prefix = (0, "")
+
+
+def utc_timestamp() -> str:
+    """
+    Current UTC time in the same ISO 8601 form as datetime.utcnow().isoformat().
+
+    The date and time part is formatted once per second and reused; only the
+    microseconds are formatted per call, which keeps per-log-line and
+    per-upload stamping cheap.
+    """
+    global _utc_second_prefix
+    seconds, nanoseconds = divmod(time.time_ns(), 1_000_000_000)
+    cached_second, prefix = _utc_second_prefix
+    if seconds != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _utc_second_prefix = (seconds, prefix)
+    return f"{prefix}.{nanoseconds // 1000:06d}"
+
+
 # Check if running in GCP
 IS_GCP = os.getenv('K_SERVICE') is not None
 
@@ -53,7 +75,7 @@ class StructuredLogger:
     ) -> Dict[str, Any]:
         """Build structured log entry."""
         entry = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': utc_timestamp(),
             'severity': level,
             'message': message,
             'service': self.service_name,
@@ -1,5 +1,7 @@
 """SQLAlchemy database models for DocProc AI."""
 
+import os
+import time
 import uuid
 from datetime import datetime
 from sqlalchemy import (
@@ -16,13 +18,28 @@ from sqlalchemy import (
     Index,
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB, INET
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from pgvector.sqlalchemy import Vector
 
 from .database import Base
 
 
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUID (RFC 9562 version 7).
+
+    The leading 48 bits are the Unix time in milliseconds, so new keys land
+    on the right-hand edge of the primary key B-tree instead of at random
+    pages. Used for high-write tables; tenants and users keep random v4 IDs.
+    """
+    unix_ts_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    rand_a = (rand >> 62) & 0xFFF
+    rand_b = rand & ((1 << 62) - 1)
+    return uuid.UUID(int=(unix_ts_ms & 0xFFFFFFFFFFFF) << 80 | 0x7 << 76 | rand_a << 64 | 0b10 << 62 | rand_b)
+
+
 class Tenant(Base):
     """Multi-tenant organization."""
 
@@ -72,7 +89,7 @@ class Document(Base):
 
     __tablename__ = "documents"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
@@ -148,8 +165,8 @@ class InvoiceData(Base):
     # Line items (stored as JSONB for flexibility)
     line_items = Column(JSONB, default=[])
 
-    # Raw extraction
-    raw_extraction = Column(JSONB)
+    # Raw extraction (debugging only; never returned by the API)
+    raw_extraction = deferred(Column(JSONB))
 
     # Human validation
     is_validated = Column(Boolean, default=False)
@@ -167,6 +184,7 @@ class InvoiceData(Base):
     __table_args__ = (
         Index("idx_tenant_invoices", "tenant_id", "invoice_date"),
         Index("idx_invoice_validation", "is_validated"),
+        Index("idx_invoice_document", "document_id", "tenant_id"),
     )
 
 
@@ -175,30 +193,36 @@ class OCRResult(Base):
 
     __tablename__ = "ocr_results"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
 
-    extracted_text = Column(Text, nullable=False)
+    # Full text can be multi-MB; only loaded when explicitly undeferred
+    extracted_text = deferred(Column(Text, nullable=False))
     confidence_score = Column(DECIMAL(5, 4))
     page_count = Column(Integer)
     ocr_method = Column(String(50))
 
-    # Bounding boxes and layout (optional)
-    layout_data = Column(JSONB)
+    # Bounding boxes and layout (optional); large and not returned by the API
+    layout_data = deferred(Column(JSONB))
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     document = relationship("Document", back_populates="ocr_result")
 
+    # Indexes
+    __table_args__ = (
+        Index("idx_ocr_document", "document_id", "tenant_id"),
+    )
+
 
 class DocumentSummary(Base):
     """Document summaries generated by AI."""
 
     __tablename__ = "document_summaries"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
 
@@ -212,13 +236,20 @@ class DocumentSummary(Base):
     # Relationships
     document = relationship("Document", back_populates="summaries")
 
+    # Indexes
+    __table_args__ = (
+        Index("idx_summary_tenant_created", "tenant_id", "created_at", "id"),
+        Index("idx_summary_doc_tenant", "document_id", "tenant_id", "created_at"),
+    )
+
 
 class DocumentChunk(Base):
     """Document chunks for RAG (Retrieval-Augmented Generation)."""
 
+    # Hash-partitioned by tenant_id in the database (migration 005)
     __tablename__ = "document_chunks"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
 
@@ -274,9 +305,10 @@ class DocumentFillingResult(Base):
 class AuditLog(Base):
     """Audit logs for compliance (GDPR, EU AI Act)."""
 
+    # Range-partitioned by created_at month in the database (migration 005)
     __tablename__ = "audit_logs"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
     document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"))
@@ -1,236 +1,53 @@
-"""Google Pub/Sub utilities."""
-"""Google Cloud Pub/Sub utilities."""
-
-from google.cloud import pubsub_v1
-import json
-from typing import Dict, Any
-
 """Google Pub/Sub utilities for async job processing."""
 
-import json
-from typing import Dict, Any
+import atexit
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, List, Tuple
 from uuid import UUID
+import orjson
 from google.cloud import pubsub_v1
-from .config import get_settings
+from .config import (
+    get_settings,
+    PUBSUB_TOPIC_INVOICE,
+    PUBSUB_TOPIC_OCR,
+    PUBSUB_TOPIC_SUMMARY,
+    PUBSUB_TOPIC_RAG_INGEST,
+    PUBSUB_TOPIC_DOCFILL,
+    PUBSUB_TOPIC_PROCESSING_COMPLETE,
+)
 
 settings = get_settings()
 
+# Messages published within max_latency of each other share one request.
+# Latency is kept at the client default because most callers wait on the result.
+PUBLISHER_BATCH_SETTINGS = pubsub_v1.types.BatchSettings(
+    max_messages=100,
+    max_bytes=1_000_000,
+    max_latency=0.01,
+)
 
-class PubSubPublisher:
-    """Publish messages to Pub/Sub topics."""
-
-    def __init__(self):
-        self.client = pubsub_v1.PublisherClient()
-        self.project_id = settings.project_id
-
-    def _publish(self, topic_name: str, message: Dict[str, Any]) -> str:
-        """
-        Publish message to topic.
-
-        Args:
-            topic_name: Pub/Sub topic name
-            message: Message dictionary to publish
-        self.publisher = pubsub_v1.PublisherClient()
-        self.project_id = settings.project_id
-
-    def _get_topic_path(self, topic_name: str) -> str:
-        """Get full topic path."""
-        return self.publisher.topic_path(self.project_id, topic_name)
-
-    def _publish(self, topic_name: str, message: Dict[str, Any]) -> str:
-        """
-        Generic publish method.
-
-        Args:
-            topic_name: Pub/Sub topic name
-            message: Message data dictionary
-    """Publish messages to Google Pub/Sub topics."""
-
-    def __init__(self):
-        self.client = pubsub_v1.PublisherClient()
-        self.project_id = settings.project_id
-
-    def _publish_message(self, topic_name: str, message: Dict[str, Any]) -> str:
-        """
-        Publish a message to a Pub/Sub topic.
-
-        Args:
-            topic_name: Name of the topic
-            message: Message data as dictionary
-
-        Returns:
-            Message ID
-        """
-        topic_path = self.client.topic_path(self.project_id, topic_name)
-        message_json = json.dumps(message)
-        message_bytes = message_json.encode("utf-8")
-
-        topic_path = self._get_topic_path(topic_name)
-        message_bytes = json.dumps(message).encode("utf-8")
-
-        try:
-            future = self.publisher.publish(topic_path, message_bytes)
-            message_id = future.result()
-            return message_id
-        except Exception as e:
-            print(f"Error publishing to {topic_name}: {e}")
-            raise
-
-    def publish_invoice_processing(self, message: Dict[str, Any]) -> str:
-        """Publish invoice processing job."""
-        return self._publish(settings.pubsub_topic_invoice, message)
-
-    def publish_ocr_processing(self, message: Dict[str, Any]) -> str:
-        """Publish OCR processing job."""
-        return self._publish(settings.pubsub_topic_ocr, message)
-
-    def publish_summarization(self, message: Dict[str, Any]) -> str:
-        """Publish summarization job."""
-        return self._publish(settings.pubsub_topic_summary, message)
-
-    def publish_rag_ingestion(self, message: Dict[str, Any]) -> str:
-        """Publish RAG ingestion job."""
-        return self._publish(settings.pubsub_topic_rag_ingest, message)
-
-    def publish_document_filling(self, message: Dict[str, Any]) -> str:
-        """Publish document filling job."""
-        return self._publish(settings.pubsub_topic_docfill, message)
-
-    def publish_message(self, topic_name: str, message: Dict[str, Any]) -> str:
-        """Generic publish method for any topic."""
-        return self._publish(topic_name, message)
-        topic_path = self.client.topic_path(self.project_id, topic_name)
-
-        # Convert message to JSON bytes
-        message_json = json.dumps(message)
-        message_bytes = message_json.encode("utf-8")
-
-        # Publish message
-        future = self.client.publish(topic_path, message_bytes)
-        message_id = future.result()
-
-        return message_id
-
-    def publish_summarization(self, message: Dict[str, Any]) -> str:
-        """
-        Publish summarization job.
-
-        Expected message format:
-        {
-            "tenant_id": "uuid",
-            "user_id": "uuid",
-            "document_id": "uuid",
-            "gcs_path": "gs://bucket/path",
-            "model_preference": "flash|pro|auto",
-            "summary_type": "concise|detailed"
-        }
-        """
-        return self._publish(settings.pubsub_topic_summary, message)
-
-    def publish_ocr(self, message: Dict[str, Any]) -> str:
-        """Publish OCR job."""
-        return self._publish(settings.pubsub_topic_ocr, message)
-
-    def publish_invoice(self, message: Dict[str, Any]) -> str:
-        """Publish invoice processing job."""
-        return self._publish(settings.pubsub_topic_invoice, message)
-
-    def publish_rag_ingest(self, message: Dict[str, Any]) -> str:
-        """Publish RAG ingestion job."""
-        return self._publish(settings.pubsub_topic_rag_ingest, message)
-
-    def publish_docfill(self, message: Dict[str, Any]) -> str:
-        """Publish document filling job."""
-        return self._publish(settings.pubsub_topic_docfill, message)
-    def publish_invoice_processing(self, message: Dict[str, Any]) -> str:
-        """Publish invoice processing job."""
-        return self._publish_message(settings.pubsub_topic_invoice, message)
-
-    def publish_ocr_processing(self, message: Dict[str, Any]) -> str:
-        """Publish OCR processing job."""
-        return self._publish_message(settings.pubsub_topic_ocr, message)
-
-    def publish_summarization_processing(self, message: Dict[str, Any]) -> str:
-        """Publish summarization processing job."""
-        return self._publish_message(settings.pubsub_topic_summarization, message)
-
-    def publish_rag_ingestion(self, message: Dict[str, Any]) -> str:
-        """Publish RAG ingestion job."""
-        return self._publish_message(settings.pubsub_topic_rag_ingest, message)
-
-    def publish_rag_query(self, message: Dict[str, Any]) -> str:
-        """Publish RAG query job."""
-        return self._publish_message(settings.pubsub_topic_rag_query, message)
-
-    def publish_document_filling(self, message: Dict[str, Any]) -> str:
-        """Publish document filling job."""
-        return self._publish_message(settings.pubsub_topic_docfill, message)
-    """Publish messages to Pub/Sub topics."""
-
-    def __init__(self):
-        self.publisher = pubsub_v1.PublisherClient()
-        self.project_id = settings.project_id
-
-    def _get_topic_path(self, topic_name: str) -> str:
-        """Get full topic path."""
-        return self.publisher.topic_path(self.project_id, topic_name)
-
-    def publish_invoice_processing(self, message: Dict[str, Any]) -> str:
-        """Publish invoice processing job."""
-        topic_path = self._get_topic_path(settings.pubsub_topic_invoice)
-        message_bytes = json.dumps(message).encode("utf-8")
-
-        future = self.publisher.publish(topic_path, message_bytes)
-        return future.result()
-
-    def publish_ocr_processing(self, message: Dict[str, Any]) -> str:
-        """Publish OCR processing job."""
-        topic_path = self._get_topic_path(settings.pubsub_topic_ocr)
-        message_bytes = json.dumps(message).encode("utf-8")
-
-        future = self.publisher.publish(topic_path, message_bytes)
-        return future.result()
-
-    def publish_summarization(self, message: Dict[str, Any]) -> str:
-        """Publish summarization job."""
-        topic_path = self._get_topic_path(settings.pubsub_topic_summary)
-        message_bytes = json.dumps(message).encode("utf-8")
-
-        future = self.publisher.publish(topic_path, message_bytes)
-        return future.result()
-
-    def publish_rag_ingestion(self, message: Dict[str, Any]) -> str:
-        """Publish RAG ingestion job."""
-        topic_path = self._get_topic_path(settings.pubsub_topic_rag_ingest)
-        message_bytes = json.dumps(message).encode("utf-8")
-
-        future = self.publisher.publish(topic_path, message_bytes)
-        return future.result()
-
-    def publish_document_filling(self, message: Dict[str, Any]) -> str:
-        """Publish document filling job."""
-        topic_path = self._get_topic_path(settings.pubsub_topic_docfill)
-        message_bytes = json.dumps(message).encode("utf-8")
-
-        future = self.publisher.publish(topic_path, message_bytes)
-        return future.result()
-
-    def publish_message(self, topic_name: str, message: Dict[str, Any]) -> str:
-        """Generic publish method."""
-        topic_path = self._get_topic_path(topic_name)
-        message_bytes = json.dumps(message).encode("utf-8")
-
-        future = self.publisher.publish(topic_path, message_bytes)
-        return future.result()
 # Initialize Pub/Sub publisher
 _publisher_client = None
+_publisher_lock = threading.Lock()
 
 
 def get_publisher_client() -> pubsub_v1.PublisherClient:
-    """Get or create Pub/Sub publisher client."""
+    """
+    Get or create the process-wide Pub/Sub publisher client.
+
+    All publish helpers share this client (and its gRPC channel), so messages
+    from every router land in the same batcher. Pending messages are flushed
+    on interpreter exit.
+    """
     global _publisher_client
     if _publisher_client is None:
-        _publisher_client = pubsub_v1.PublisherClient()
+        with _publisher_lock:
+            if _publisher_client is None:
+                _publisher_client = pubsub_v1.PublisherClient(
+                    batch_settings=PUBLISHER_BATCH_SETTINGS
+                )
+                atexit.register(_publisher_client.stop)
     return _publisher_client
 
 
@@ -245,21 +62,54 @@ def publish_message(topic_name: str, message_data: Dict[str, Any]) -> str:
     Returns:
         Message ID
     """
-    publisher = get_publisher_client()
+    return publish_messages(topic_name, [message_data])[0]
 
-    # Construct full topic path
-    topic_path = publisher.topic_path(settings.gcp_project_id, topic_name)
 
-    # Convert message to JSON bytes
-    message_bytes = json.dumps(message_data).encode("utf-8")
+def publish_messages(topic_name: str, messages: List[Dict[str, Any]]) -> List[str]:
+    """
+    Publish several messages to a Pub/Sub topic.
+
+    All messages are handed to the client before waiting on any of them,
+    so the client's batcher can send them in as few requests as possible.
+
+    Args:
+        topic_name: Topic name (without project path)
+        messages: Message payloads as dictionaries
 
-    # Publish message
-    future = publisher.publish(topic_path, message_bytes)
+    Returns:
+        Message IDs, in the same order as the messages
+    """
+    futures = [publish_message_nowait(topic_name, message_data) for message_data in messages]
 
-    # Wait for publish to complete and get message ID
-    message_id = future.result()
+    # Wait for publish to complete and get message IDs
+    return [future.result() for future in futures]
 
-    return message_id
+
+def publish_message_nowait(topic_name: str, message_data: Dict[str, Any]) -> Future:
+    """
+    Hand a message to the batching publisher without waiting for the RPC.
+
+    Payloads are encoded with orjson, which serializes UUIDs natively; the
+    message also carries its tenant ID as an attribute so subscriptions can
+    filter on it without decoding the body.
+
+    Args:
+        topic_name: Topic name (without project path)
+        message_data: Message payload as dictionary
+
+    Returns:
+        Future resolving to the message ID
+    """
+    publisher = get_publisher_client()
+
+    # Construct full topic path
+    topic_path = publisher.topic_path(settings.project_id, topic_name)
+
+    return publisher.publish(
+        topic_path,
+        orjson.dumps(message_data),
+        tenant_id=str(message_data["tenant_id"])
+    )
 
 
 def publish_invoice_processing_job(
@@ -282,16 +132,71 @@ def publish_invoice_processing_job(
     Returns:
         Message ID
     """
-    message_data = {
-        "tenant_id": tenant_id,
-        "user_id": user_id,
-        "document_id": str(document_id),
-        "gcs_path": gcs_path,
-        "document_type": "invoice",
-        "options": options or {}
-    }
+    return publish_invoice_processing_jobs(
+        tenant_id=tenant_id,
+        user_id=user_id,
+        documents=[(document_id, gcs_path)],
+        options=options
+    )[0]
+
+
+def publish_invoice_processing_jobs(
+    tenant_id: str,
+    user_id: str,
+    documents: List[Tuple[UUID, str]],
+    options: Dict[str, Any] = None
+) -> List[str]:
+    """
+    Publish invoice processing jobs for several documents at once.
+
+    Args:
+        tenant_id: Tenant ID
+        user_id: User ID
+        documents: (document ID, GCS path) pairs
+        options: Additional processing options applied to every job
+
+    Returns:
+        Message IDs, in the same order as the documents
+    """
+    futures = publish_invoice_processing_jobs_nowait(tenant_id, user_id, documents, options)
+    return [future.result() for future in futures]
 
-    return publish_message(settings.pubsub_invoice_topic, message_data)
+
+def publish_invoice_processing_jobs_nowait(
+    tenant_id: str,
+    user_id: str,
+    documents: List[Tuple[UUID, str]],
+    options: Dict[str, Any] = None
+) -> List[Future]:
+    """
+    Hand invoice processing jobs to the batching publisher without waiting.
+
+    Each job gets its own future, so callers can tell which documents were
+    published when only some of the batch fails.
+
+    Args:
+        tenant_id: Tenant ID
+        user_id: User ID
+        documents: (document ID, GCS path) pairs
+        options: Additional processing options applied to every job
+
+    Returns:
+        Futures resolving to the message IDs, in the same order as the documents
+    """
+    return [
+        publish_message_nowait(
+            PUBSUB_TOPIC_INVOICE,
+            {
+                "tenant_id": tenant_id,
+                "user_id": user_id,
+                "document_id": document_id,
+                "gcs_path": gcs_path,
+                "document_type": "invoice",
+                "options": options or {}
+            }
+        )
+        for document_id, gcs_path in documents
+    ]
 
 
 def publish_ocr_processing_job(
@@ -319,7 +224,7 @@ def publish_ocr_processing_job(
     message_data = {
         "tenant_id": tenant_id,
         "user_id": user_id,
-        "document_id": str(document_id),
+        "document_id": document_id,
         "gcs_path": gcs_path,
         "document_type": "generic",
         "options": {
@@ -328,7 +233,7 @@ def publish_ocr_processing_job(
         }
     }
 
-    return publish_message(settings.pubsub_ocr_topic, message_data)
+    return publish_message(PUBSUB_TOPIC_OCR, message_data)
 
 
 def publish_summarization_job(
@@ -338,9 +243,12 @@ def publish_summarization_job(
     gcs_path: str,
     model: str = "gemini-1.5-flash",
     options: Dict[str, Any] = None
-) -> str:
+) -> Future:
     """
-    Publish a summarization job.
+    Publish a summarization job without waiting for the RPC.
+
+    The job joins the publisher's current batch; callers that need to react
+    to a failed publish should attach a done callback to the returned future.
 
     Args:
         tenant_id: Tenant ID
@@ -351,12 +259,12 @@ def publish_summarization_job(
         options: Additional processing options
 
     Returns:
-        Message ID
+        Future resolving to the message ID
     """
     message_data = {
         "tenant_id": tenant_id,
         "user_id": user_id,
-        "document_id": str(document_id),
+        "document_id": document_id,
         "gcs_path": gcs_path,
         "document_type": "generic",
         "options": {
@@ -365,7 +273,7 @@ def publish_summarization_job(
         }
     }
 
-    return publish_message(settings.pubsub_summarization_topic, message_data)
+    return publish_message_nowait(PUBSUB_TOPIC_SUMMARY, message_data)
 
 
 def publish_rag_ingestion_job(
@@ -391,13 +299,13 @@ def publish_rag_ingestion_job(
     message_data = {
         "tenant_id": tenant_id,
         "user_id": user_id,
-        "document_id": str(document_id),
+        "document_id": document_id,
         "gcs_path": gcs_path,
         "document_type": "generic",
         "options": options or {}
     }
 
-    return publish_message(settings.pubsub_rag_ingestion_topic, message_data)
+    return publish_message(PUBSUB_TOPIC_RAG_INGEST, message_data)
 
 
 def publish_document_filling_job(
@@ -425,7 +333,7 @@ def publish_document_filling_job(
     message_data = {
         "tenant_id": tenant_id,
         "user_id": user_id,
-        "document_id": str(document_id),
+        "document_id": document_id,
         "gcs_path": gcs_path,
         "document_type": "id_document",
         "options": {
@@ -434,7 +342,7 @@ def publish_document_filling_job(
         }
     }
 
-    return publish_message(settings.pubsub_docfill_topic, message_data)
+    return publish_message(PUBSUB_TOPIC_DOCFILL, message_data)
 
 
 def publish_processing_complete_event(
@@ -459,10 +367,10 @@ def publish_processing_complete_event(
     """
     message_data = {
         "tenant_id": tenant_id,
-        "document_id": str(document_id),
+        "document_id": document_id,
         "processing_type": processing_type,
         "status": status,
         "details": details or {}
     }
 
-    return publish_message(settings.pubsub_processing_complete_topic, message_data)
+    return publish_message(PUBSUB_TOPIC_PROCESSING_COMPLETE, message_data)
@@ -12,7 +12,7 @@ class RateLimiter:
     def __init__(self, redis_client=None):
         self.redis = redis_client or (cache.client if cache.enabled else None)
 
-    def check_rate_limit(
+    async def check_rate_limit(
         self,
         key: str,
         max_requests: int,
@@ -31,11 +31,11 @@ class RateLimiter:
 
         try:
             # Increment counter
-            count = self.redis.incr(window_key)
+            count = await self.redis.incr(window_key)
 
             # Set expiry on first request in window
             if count == 1:
-                self.redis.expire(window_key, window_seconds * 2)
+                await self.redis.expire(window_key, window_seconds * 2)
 
             return count <= max_requests
         except Exception:
@@ -72,7 +72,7 @@ def rate_limit(max_requests: int = 100, window_seconds: int = 60):
                 rate_key = f"ip:{client_ip}"
 
             # Check rate limit
-            if not rate_limiter.check_rate_limit(rate_key, max_requests, window_seconds):
+            if not await rate_limiter.check_rate_limit(rate_key, max_requests, window_seconds):
                 raise HTTPException(
                     status_code=429,
                     detail="Rate limit exceeded. Please try again later.",
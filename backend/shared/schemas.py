@@ -87,6 +87,12 @@ class DocumentResponse(BaseModel):
         from_attributes = True
 
 
+class DocumentMetadata(BaseModel):
+    """Editable document metadata; omitted fields are left unchanged."""
+    document_type: Optional[str] = None
+    filename: Optional[str] = None
+
+
 class DocumentListResponse(BaseModel):
     """Paginated document list."""
     documents: List[DocumentResponse]
@@ -115,6 +121,11 @@ class InvoiceProcessRequest(BaseModel):
     document_id: UUID
 
 
+class InvoiceBatchProcessRequest(BaseModel):
+    """Request to process several invoices at once."""
+    document_ids: List[UUID] = Field(..., min_length=1, max_length=500)
+
+
 class InvoiceDataResponse(BaseModel):
     """Extracted invoice data."""
     id: UUID
@@ -161,7 +172,7 @@ class OCRResultResponse(BaseModel):
     id: UUID
     document_id: UUID
     extracted_text: str
-    confidence_score: Optional[Decimal]
+    confidence_score: Optional[float]
     page_count: Optional[int]
     ocr_method: str
     created_at: datetime
@@ -326,6 +337,15 @@ class JobStatusResponse(BaseModel):
     estimated_completion: Optional[datetime] = None
 
 
+class BatchJobStatusResponse(BaseModel):
+    """Async batch job status response."""
+    job_ids: List[str]
+    status: str
+    message: str
+    document_ids: List[str] = []  # Documents whose jobs were started, in job_ids order
+    failed_document_ids: List[str] = []  # Documents whose jobs could not be published
+
+
 # ============================================================================
 # Pub/Sub Message Schemas
 # ============================================================================
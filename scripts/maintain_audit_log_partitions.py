@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Create the upcoming monthly audit_logs partitions.
+
+audit_logs is range-partitioned by month (migration 005). Rows past the
+last monthly partition land in audit_logs_default, which is never pruned
+and grows without bound, so run this at least monthly (e.g. a Cloud
+Scheduler-triggered job on the 1st). It is idempotent.
+
+Usage:
+    python scripts/maintain_audit_log_partitions.py [months_ahead]
+"""
+
+from sqlalchemy import create_engine, text
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.shared.config import get_settings
+
+settings = get_settings()
+
+# Matches AUDIT_LOG_MONTHS_AHEAD in migration 005
+DEFAULT_MONTHS_AHEAD = 12
+
+
+def ensure_partitions(months_ahead: int = DEFAULT_MONTHS_AHEAD) -> int:
+    """Create any missing audit_logs partitions from this month to months_ahead ahead."""
+    engine = create_engine(settings.database_url)
+    try:
+        with engine.begin() as connection:
+            return connection.execute(
+                text("SELECT ensure_audit_log_partitions(:months_ahead)"),
+                {"months_ahead": months_ahead}
+            ).scalar_one()
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    months_ahead = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MONTHS_AHEAD
+    created = ensure_partitions(months_ahead)
+    print(f"Created {created} audit_logs partition(s) ({months_ahead} months ahead)")
@@ -0,0 +1,151 @@
+"""Tests for the cached decorator and its cache keys."""
+
+import asyncio
+import sys
+import os
+
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from shared import cache as cache_module
+from shared.cache import _NONE_SENTINEL, _make_cache_key, cached
+
+
+class FakeCache:
+    """In-memory stand-in for CacheManager that records writes."""
+
+    def __init__(self):
+        self.store = {}
+        self.sets = []
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ttl=300):
+        self.store[key] = value
+        self.sets.append((key, value, ttl))
+
+
+@pytest.fixture
+def fake_cache(monkeypatch):
+    fake = FakeCache()
+    monkeypatch.setattr(cache_module, "cache", fake)
+    return fake
+
+
+def test_concurrent_misses_share_one_call(fake_cache):
+    """Concurrent misses for the same key wait on the call already in flight."""
+    calls = []
+
+    @cached("test")
+    async def lookup(item_id):
+        calls.append(item_id)
+        await asyncio.sleep(0.01)
+        return {"id": item_id}
+
+    async def run():
+        return await asyncio.gather(*(lookup("a") for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert calls == ["a"]
+    assert results == [{"id": "a"}] * 5
+    assert len(fake_cache.sets) == 1
+    assert not cache_module._inflight
+
+
+def test_inflight_error_reaches_every_waiter(fake_cache):
+    """An exception from the shared call is raised to all waiters and nothing is cached."""
+    calls = []
+
+    @cached("test")
+    async def lookup(item_id):
+        calls.append(item_id)
+        await asyncio.sleep(0.01)
+        raise ValueError("backend down")
+
+    async def run():
+        return await asyncio.gather(*(lookup("a") for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert calls == ["a"]
+    assert all(isinstance(result, ValueError) for result in results)
+    assert fake_cache.sets == []
+    assert not cache_module._inflight
+
+
+def test_none_result_is_cached_with_negative_ttl(fake_cache):
+    """None is stored as the sentinel for negative_ttl and returned as None on a hit."""
+    calls = []
+
+    @cached("test", ttl=300, negative_ttl=7)
+    async def lookup(item_id):
+        calls.append(item_id)
+        return None
+
+    assert asyncio.run(lookup("missing")) is None
+    assert asyncio.run(lookup("missing")) is None
+
+    assert calls == ["missing"]
+    assert [(value, ttl) for _, value, ttl in fake_cache.sets] == [(_NONE_SENTINEL, 7)]
+
+
+def test_none_result_not_cached_when_negative_ttl_disabled(fake_cache):
+    calls = []
+
+    @cached("test", negative_ttl=0)
+    async def lookup(item_id):
+        calls.append(item_id)
+        return None
+
+    asyncio.run(lookup("missing"))
+    asyncio.run(lookup("missing"))
+
+    assert calls == ["missing", "missing"]
+    assert fake_cache.sets == []
+
+
+def test_cache_key_is_stable_and_fixed_length():
+    """The same arguments give the same key, whatever the kwarg order."""
+    async def lookup():
+        pass
+
+    key = _make_cache_key("docs", "v1", lookup, ("tenant",), {"page": 1, "status": "done"})
+
+    assert key == _make_cache_key("docs", "v1", lookup, ("tenant",), {"status": "done", "page": 1})
+    assert key.startswith("docs:v1:lookup:")
+    # blake2b with digest_size=16 gives 32 hex characters
+    assert len(key.rsplit(":", 1)[1]) == 32
+
+
+def test_cache_key_distinguishes_arguments_and_version():
+    async def lookup():
+        pass
+
+    key = _make_cache_key("docs", "v1", lookup, ("tenant",), {"page": 1})
+
+    assert key != _make_cache_key("docs", "v1", lookup, ("tenant",), {"page": 2})
+    assert key != _make_cache_key("docs", "v1", lookup, ("other",), {"page": 1})
+    assert key != _make_cache_key("docs", "v2", lookup, ("tenant",), {"page": 1})
+
+
+def test_cache_key_uses_str_for_non_json_arguments():
+    """Arguments orjson cannot encode are keyed by their str()."""
+    class TenantId:
+        def __init__(self, value):
+            self.value = value
+
+        def __str__(self):
+            return self.value
+
+    async def lookup():
+        pass
+
+    key = _make_cache_key("docs", "v1", lookup, (TenantId("t1"),), {})
+
+    assert key == _make_cache_key("docs", "v1", lookup, (TenantId("t1"),), {})
+    assert key == _make_cache_key("docs", "v1", lookup, ("t1",), {})
+    assert key != _make_cache_key("docs", "v1", lookup, (TenantId("t2"),), {})
@@ -0,0 +1,83 @@
+"""Tests for settings parsing."""
+
+import sys
+import os
+
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from shared.config import Settings
+
+
+@pytest.fixture
+def clean_env(monkeypatch):
+    """Unset every settings env var so only the test's values apply."""
+    for name in Settings.__dataclass_fields__:
+        monkeypatch.delenv(name.upper(), raising=False)
+    return monkeypatch
+
+
+def test_from_env_uses_defaults(clean_env):
+    settings = Settings.from_env()
+
+    assert settings == Settings()
+    assert settings.environment == "dev"
+    assert settings.debug is False
+    assert settings.db_pool_size == 5
+
+
+def test_from_env_parses_field_types(clean_env):
+    clean_env.setenv("DEBUG", "true")
+    clean_env.setenv("DB_POOL_PRE_PING", "0")
+    clean_env.setenv("DB_POOL_SIZE", "20")
+    clean_env.setenv("API_TITLE", "Docs")
+    clean_env.setenv("CORS_ORIGINS", " https://a.example, ,https://b.example ,")
+
+    settings = Settings.from_env()
+
+    assert settings.debug is True
+    assert settings.db_pool_pre_ping is False
+    assert settings.db_pool_size == 20
+    assert settings.api_title == "Docs"
+    assert settings.cors_origins == ("https://a.example", "https://b.example")
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1", True), ("yes", True), ("On", True), (" TRUE ", True),
+    ("0", False), ("no", False), ("off", False), ("", False),
+])
+def test_from_env_bool_values(clean_env, value, expected):
+    clean_env.setenv("DEBUG", value)
+
+    assert Settings.from_env().debug is expected
+
+
+def test_from_env_rejects_invalid_int(clean_env):
+    clean_env.setenv("DB_POOL_SIZE", "many")
+
+    with pytest.raises(ValueError):
+        Settings.from_env()
+
+
+def test_derived_defaults_follow_environment(clean_env):
+    clean_env.setenv("ENVIRONMENT", "staging")
+    clean_env.setenv("PROJECT_ID", "my-project")
+
+    settings = Settings.from_env()
+
+    assert settings.gcs_bucket_uploads == "docai-uploads-staging"
+    assert settings.gcs_bucket_processed == "docai-processed-staging"
+    assert settings.gcs_bucket_temp == "docai-temp-staging"
+    assert settings.firebase_project_id == "my-project"
+
+
+def test_explicit_values_override_derived_defaults(clean_env):
+    clean_env.setenv("GCS_BUCKET_UPLOADS", "custom-uploads")
+    clean_env.setenv("FIREBASE_PROJECT_ID", "auth-project")
+
+    settings = Settings.from_env()
+
+    assert settings.gcs_bucket_uploads == "custom-uploads"
+    assert settings.firebase_project_id == "auth-project"
@@ -0,0 +1,209 @@
+"""Tests for GCS path helpers."""
+
+from datetime import timedelta
+import sys
+import os
+
+import pytest
+from google.cloud.exceptions import Forbidden
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from shared import gcs
+from shared.gcs import _parse_gcs_uri, _signed_url, delete_files_from_gcs
+
+
+def test_parse_gcs_uri_splits_bucket_and_path():
+    assert _parse_gcs_uri("gs://docai-uploads-dev/tenant/doc.pdf") == ("docai-uploads-dev", "tenant/doc.pdf")
+
+
+def test_parse_gcs_uri_keeps_nested_path_intact():
+    assert _parse_gcs_uri("gs://bucket/a/b/c d.pdf") == ("bucket", "a/b/c d.pdf")
+
+
+@pytest.mark.parametrize("gcs_uri", [
+    "",
+    "bucket/path.pdf",
+    "s3://bucket/path.pdf",
+    "GS://bucket/path.pdf",
+    "gs://",
+    "gs://bucket",
+    "gs://bucket/",
+    "gs:///path.pdf",
+])
+def test_parse_gcs_uri_rejects_invalid_uris(gcs_uri):
+    with pytest.raises(ValueError, match="Invalid GCS path"):
+        _parse_gcs_uri(gcs_uri)
+
+
+def test_parse_gcs_uri_is_memoized():
+    _parse_gcs_uri.cache_clear()
+
+    _parse_gcs_uri("gs://bucket/one.pdf")
+    _parse_gcs_uri("gs://bucket/one.pdf")
+
+    assert _parse_gcs_uri.cache_info().hits == 1
+
+
+class FakeBucket:
+    """Bucket stand-in whose blobs sign URLs locally and record each expiration."""
+
+    def __init__(self):
+        self.expirations = []
+
+    def blob(self, blob_path):
+        bucket = self
+
+        class FakeBlob:
+            def generate_signed_url(self, version, expiration, method):
+                bucket.expirations.append(expiration)
+                return f"https://signed/{blob_path}?n={len(bucket.expirations)}"
+
+        return FakeBlob()
+
+
+@pytest.fixture
+def fake_signing(monkeypatch):
+    bucket = FakeBucket()
+    clock = [1000.0]
+    monkeypatch.setattr(gcs, "_bucket", lambda name: bucket)
+    monkeypatch.setattr(gcs.time, "monotonic", lambda: clock[0])
+    gcs._signed_urls.clear()
+    yield bucket, clock
+    gcs._signed_urls.clear()
+
+
+def test_signed_url_uses_exact_requested_expiry(fake_signing):
+    bucket, _ = fake_signing
+
+    _signed_url("bucket", "doc.pdf", 15)
+
+    assert bucket.expirations == [timedelta(minutes=15)]
+
+
+def test_signed_url_is_reused_within_reuse_window(fake_signing):
+    bucket, clock = fake_signing
+
+    first = _signed_url("bucket", "doc.pdf", 15)
+    clock[0] += gcs.SIGNED_URL_REUSE_SECONDS - 1
+    assert _signed_url("bucket", "doc.pdf", 15) == first
+
+    clock[0] += 1
+    assert _signed_url("bucket", "doc.pdf", 15) != first
+    assert len(bucket.expirations) == 2
+
+
+def test_short_lived_url_is_dropped_before_margin(fake_signing):
+    """A reused URL always has at least SIGNED_URL_MIN_REMAINING_SECONDS left."""
+    bucket, clock = fake_signing
+
+    first = _signed_url("bucket", "doc.pdf", 2)
+    clock[0] += 120 - gcs.SIGNED_URL_MIN_REMAINING_SECONDS - 1
+    assert _signed_url("bucket", "doc.pdf", 2) == first
+
+    clock[0] += 1
+    assert _signed_url("bucket", "doc.pdf", 2) != first
+
+
+def test_url_shorter_than_margin_is_not_cached(fake_signing):
+    bucket, _ = fake_signing
+
+    _signed_url("bucket", "doc.pdf", 1)
+    _signed_url("bucket", "doc.pdf", 1)
+
+    assert len(bucket.expirations) == 2
+
+
+class FakeResponse:
+    """Batch sub-response with just what from_http_response reads."""
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = ""
+        self.request = type("Request", (), {"method": "DELETE", "url": "https://storage/obj"})()
+
+    def json(self):
+        return {"error": {"message": f"status {self.status_code}"}}
+
+
+class FakeBatchClient:
+    """Client whose batches answer each deferred delete with the next scripted status."""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.batches = []
+        self.pending = None
+
+    def batch(self, raise_exception=True):
+        assert raise_exception is False
+        client = self
+
+        class FakeBatch:
+            def __enter__(self):
+                client.pending = []
+                return self
+
+            def __exit__(self, *exc):
+                self._responses = [FakeResponse(client.statuses.pop(0)) for _ in client.pending]
+                client.batches.append(len(client.pending))
+
+        return FakeBatch()
+
+    def delete(self, blob_path):
+        self.pending.append(blob_path)
+
+
+@pytest.fixture
+def fake_batch_client(monkeypatch):
+    def install(statuses):
+        client = FakeBatchClient(statuses)
+
+        class FakeBlob:
+            def __init__(self, blob_path):
+                self.blob_path = blob_path
+
+            def delete(self):
+                client.delete(self.blob_path)
+
+        bucket = type("Bucket", (), {"blob": lambda self, blob_path: FakeBlob(blob_path)})()
+        monkeypatch.setattr(gcs, "_client", lambda: client)
+        monkeypatch.setattr(gcs, "_bucket", lambda name: bucket)
+        return client
+
+    return install
+
+
+def test_delete_files_sends_batches_of_batch_limit(fake_batch_client):
+    paths = [f"gs://bucket/{index}.pdf" for index in range(gcs.BATCH_REQUEST_LIMIT + 5)]
+    client = fake_batch_client([204] * len(paths))
+
+    delete_files_from_gcs(paths)
+
+    assert client.batches == [gcs.BATCH_REQUEST_LIMIT, 5]
+
+
+def test_delete_files_ignores_missing_files(fake_batch_client):
+    fake_batch_client([404, 204, 404])
+
+    delete_files_from_gcs(["gs://bucket/a", "gs://bucket/b", "gs://bucket/c"])
+
+
+def test_delete_files_raises_non_404_failure_behind_a_404(fake_batch_client):
+    """A 404 earlier in the batch must not hide a later 403."""
+    client = fake_batch_client([404, 403, 204])
+
+    with pytest.raises(Forbidden):
+        delete_files_from_gcs(["gs://bucket/a", "gs://bucket/b", "gs://bucket/c"])
+
+    assert client.batches == [3]
+
+
+def test_delete_files_sends_every_batch_before_raising(fake_batch_client):
+    paths = [f"gs://bucket/{index}.pdf" for index in range(gcs.BATCH_REQUEST_LIMIT + 1)]
+    client = fake_batch_client([403] + [204] * gcs.BATCH_REQUEST_LIMIT)
+
+    with pytest.raises(Forbidden):
+        delete_files_from_gcs(paths)
+
+    assert client.batches == [gcs.BATCH_REQUEST_LIMIT, 1]
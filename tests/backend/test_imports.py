@@ -0,0 +1,46 @@
+"""Smoke test that every name imported from shared.* still exists."""
+
+import ast
+import importlib
+import sys
+import os
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / 'backend'
+
+
+def _shared_imports():
+    """
+    Yield (source file, module, name) for each 'from [backend.]shared.X import name'.
+
+    Checked statically: route modules such as chat.py initialise Vertex AI
+    at import, and main.py turns any ImportError from a route into a missing
+    router, so a broken import would otherwise only show up as absent routes.
+    """
+    for path in sorted(BACKEND_DIR.rglob('*.py')):
+        tree = ast.parse(path.read_text(), filename=str(path))
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.ImportFrom) or node.level or not node.module:
+                continue
+            module = node.module.removeprefix('backend.')
+            if not module.startswith('shared.'):
+                continue
+            for alias in node.names:
+                yield str(path.relative_to(BACKEND_DIR)), module, alias.name
+
+
+@pytest.mark.parametrize(
+    'source, module, name',
+    [pytest.param(*item, id=f'{item[0]}:{item[1]}.{item[2]}') for item in _shared_imports()]
+)
+def test_shared_import_exists(source, module, name):
+    shared_module = importlib.import_module(module)
+    # __all__ covers attributes such as shared.database.engine that are only
+    # built on first access; touching them here would connect to a database
+    exported = set(vars(shared_module)) | set(getattr(shared_module, '__all__', ()))
+    assert name in exported, f'{source} imports missing {module}.{name}'
@@ -0,0 +1,42 @@
+"""Tests for structured logging helpers."""
+
+from datetime import datetime, timedelta
+import re
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from shared import logging_utils
+from shared.logging_utils import utc_timestamp
+
+
+def test_utc_timestamp_matches_utcnow_isoformat_layout():
+    """Same naive ISO 8601 layout as datetime.utcnow().isoformat(), no offset."""
+    assert re.fullmatch(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}", utc_timestamp())
+
+
+def test_utc_timestamp_is_current_utc_time():
+    before = datetime.utcnow()
+    stamp = datetime.fromisoformat(utc_timestamp())
+    after = datetime.utcnow()
+
+    assert before - timedelta(microseconds=1) <= stamp <= after
+
+
+def test_utc_timestamp_reformats_when_the_second_changes(monkeypatch):
+    now = [1_700_000_000_250_000_000]
+    monkeypatch.setattr(logging_utils.time, "time_ns", lambda: now[0])
+    monkeypatch.setattr(logging_utils, "_utc_second_prefix", (0, ""))
+
+    assert utc_timestamp() == "2023-11-14T22:13:20.250000"
+
+    now[0] += 1_000_000_000
+    assert utc_timestamp() == "2023-11-14T22:13:21.250000"
+
+
+def test_log_entries_use_utc_timestamp():
+    entry = logging_utils.StructuredLogger("test")._build_log_entry("INFO", "hello")
+
+    assert datetime.fromisoformat(entry["timestamp"]).tzinfo is None
@@ -0,0 +1,48 @@
+"""Tests for model helpers."""
+
+import sys
+import os
+import time
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from shared import models
+from shared.models import uuid7
+
+
+def test_uuid7_version_and_variant():
+    value = uuid7()
+
+    assert value.version == 7
+    assert value.variant == "specified in RFC 4122"
+    assert (value.int >> 76) & 0xF == 0x7
+    assert (value.int >> 62) & 0b11 == 0b10
+
+
+def test_uuid7_leading_bits_are_unix_milliseconds():
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+
+    assert before <= value.int >> 80 <= after
+
+
+def test_uuid7_sorts_by_creation_time(monkeypatch):
+    """IDs from later milliseconds sort after earlier ones, whatever their random bits."""
+    clock = iter(range(1_700_000_000_000, 1_700_000_000_100))
+    monkeypatch.setattr(models.time, "time_ns", lambda: next(clock) * 1_000_000)
+
+    values = [uuid7() for _ in range(100)]
+
+    assert values == sorted(values)
+    assert [str(value) for value in values] == sorted(str(value) for value in values)
+
+
+def test_uuid7_is_unique_within_a_millisecond(monkeypatch):
+    monkeypatch.setattr(models.time, "time_ns", lambda: 1_700_000_000_000 * 1_000_000)
+
+    values = {uuid7() for _ in range(1000)}
+
+    assert len(values) == 1000
+    assert {value.int >> 80 for value in values} == {1_700_000_000_000}
@@ -0,0 +1,52 @@
+"""Tests for summary list pagination."""
+
+from datetime import datetime, timezone
+import sys
+import os
+import uuid
+
+# Add backend and the API gateway to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend', 'api_gateway'))
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from shared.models import DocumentSummary
+from api_gateway.routes.summaries import _apply_cursor
+
+CURSOR = datetime(2025, 11, 18, 12, 0, tzinfo=timezone.utc)
+CURSOR_ID = uuid.UUID("01937a4e-8c00-7000-8000-000000000000")
+
+
+def _compile(query):
+    compiled = query.compile(dialect=postgresql.dialect())
+    return str(compiled), list(compiled.params.values())
+
+
+def test_no_cursor_leaves_query_unfiltered():
+    query = select(DocumentSummary)
+
+    assert _apply_cursor(query, None, None) is query
+
+
+def test_cursor_and_id_use_row_comparison():
+    """Ties on created_at are broken by id, so no row is skipped or repeated between pages."""
+    sql, params = _compile(_apply_cursor(select(DocumentSummary), CURSOR, CURSOR_ID))
+
+    assert "(document_summaries.created_at, document_summaries.id) < (" in sql
+    assert params == [CURSOR, CURSOR_ID]
+
+
+def test_cursor_without_id_filters_on_created_at():
+    sql, params = _compile(_apply_cursor(select(DocumentSummary), CURSOR, None))
+
+    assert "document_summaries.created_at < " in sql
+    assert "document_summaries.id" not in sql.split("WHERE", 1)[1]
+    assert params == [CURSOR]
+
+
+def test_cursor_id_alone_is_ignored():
+    query = select(DocumentSummary)
+
+    assert _apply_cursor(query, None, CURSOR_ID) is query